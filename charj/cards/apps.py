@@ -15,6 +15,10 @@ class CardsConfig(AppConfig):
         with contextlib.suppress(ImportError):
             import charj.cards.signals  # noqa: F401, PLC0415
 
+        from charj.cards.stripe_client import configure_stripe  # noqa: PLC0415
+
+        configure_stripe()
+
         if os.environ.get("DJANGO_SETTINGS_MODULE") == "config.settings.production":
             import posthog  # noqa: PLC0415
 
@@ -0,0 +1,100 @@
+import pytest
+from django.test import RequestFactory
+from djstripe.models import Customer
+from djstripe.models import PaymentMethod
+
+from charj.users.models import User
+from charj.users.tests.factories import UserFactory
+
+
+@pytest.fixture(scope="session")
+def user(django_db_setup, django_db_blocker) -> User:
+    """
+    Session-scoped user shared by the cards tests.
+
+    Overrides the project-level function-scoped fixture so the dozens of
+    tests in this app reuse one committed user row instead of paying the
+    insert and savepoint cost per test. Tests only read the user and
+    attach per-test Customer/PaymentMethod rows, which still roll back.
+    """
+    with django_db_blocker.unblock():
+        return UserFactory()
+
+
+@pytest.fixture(scope="session")
+def rf() -> RequestFactory:
+    """Session-scoped RequestFactory; the factory itself is stateless."""
+    return RequestFactory()
+
+
+@pytest.fixture
+def get_request(rf: RequestFactory, user: User):
+    """Authenticated GET request for view tests that share the pattern."""
+    request = rf.get("/fake-url/")
+    request.user = user
+    return request
+
+
+@pytest.fixture
+def post_json_request(rf: RequestFactory, user: User):
+    """
+    Factory for authenticated JSON POSTs to the card API views.
+
+    Centralises the request construction the subscription tests all
+    repeat, so each test only supplies the body under test.
+    """
+
+    def _build(body: bytes | str = b"{}"):
+        request = rf.post(
+            "/fake-url/",
+            data=body,
+            content_type="application/json",
+        )
+        request.user = user
+        return request
+
+    return _build
+
+
+@pytest.fixture
+def stripe_customer(user: User, db) -> Customer:
+    """Customer row for the shared user, normally created by the
+    SetupIntent view before a subscription request arrives."""
+    customer, _ = Customer.get_or_create(subscriber=user)
+    # Reload with the subscriber joined and subscriptions prefetched so
+    # tests that traverse those relations don't issue follow-up queries
+    return (
+        Customer.objects.select_related("subscriber")
+        .prefetch_related("subscriptions")
+        .get(pk=customer.pk)
+    )
+
+
+@pytest.fixture
+def seeded_payment_method(stripe_customer: Customer) -> PaymentMethod:
+    """
+    A saved Visa card for the shared customer.
+
+    Inserted with bulk_create so the row costs a single INSERT with no
+    save() bookkeeping or post_save dispatch. Function-scoped on purpose:
+    a committed session-wide row would leak into the empty-state tests.
+    """
+    return PaymentMethod.objects.bulk_create(
+        [
+            PaymentMethod(
+                id="pm_seed_1",
+                customer=stripe_customer,
+                livemode=False,
+                stripe_data={
+                    "id": "pm_seed_1",
+                    "type": "card",
+                    "card": {
+                        "brand": "visa",
+                        "last4": "4242",
+                        "exp_month": 12,
+                        "exp_year": 2030,
+                    },
+                },
+            ),
+        ],
+    )[0]
@@ -0,0 +1,13 @@
+"""Management command to pre-warm the price lookup cache."""
+
+from django.core.management.base import BaseCommand
+
+from charj.cards.pricing_service import warm_price_cache
+
+
+class Command(BaseCommand):
+    help = "Load all synced active prices into the Django cache."
+
+    def handle(self, *args, **options):
+        count = warm_price_cache()
+        self.stdout.write(self.style.SUCCESS(f"Warmed {count} prices."))
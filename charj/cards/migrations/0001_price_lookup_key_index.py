@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Partial index so active-price lookups by lookup_key are index scans."""
+
+    dependencies = [
+        ("djstripe", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX IF NOT EXISTS djstripe_price_lookup_key_active "
+                "ON djstripe_price (lookup_key) WHERE active;"
+            ),
+            reverse_sql="DROP INDEX IF EXISTS djstripe_price_lookup_key_active;",
+        ),
+    ]
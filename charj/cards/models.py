@@ -1 +1,42 @@
-# Create your models here.
+from django.conf import settings
+from django.db.models import CASCADE
+from django.db.models import CharField
+from django.db.models import DateTimeField
+from django.db.models import ForeignKey
+from django.db.models import Model
+from django.db.models import UniqueConstraint
+
+
+class SubscriptionAttempt(Model):
+    """
+    Dedup record for subscription creation, one row per (user, payment
+    method).
+
+    Browsers retry timed-out POSTs; without this a retry arriving after
+    the first request succeeded would start the whole flow again. The
+    unique constraint makes the second request find the first row, and a
+    stored subscription id lets the view replay the success response
+    from one indexed SELECT instead of any Stripe traffic.
+    """
+
+    user = ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=CASCADE,
+        related_name="subscription_attempts",
+    )
+    payment_method_id = CharField(max_length=255)
+    # Empty until the Stripe call succeeds, so a failed attempt does not
+    # block retrying with the same payment method
+    subscription_id = CharField(max_length=255, blank=True, default="")
+    created_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user", "payment_method_id"],
+                name="unique_attempt_per_user_payment_method",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.user_id}:{self.payment_method_id}"
@@ -1,13 +1,27 @@
 """Pricing service for dynamic subscription price management."""
 
 import logging
+from functools import cache as memoize
+from functools import lru_cache
 
 import stripe
 from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from djstripe.models import Price
 
 logger = logging.getLogger(__name__)
 
+# Resolved (lookup_key -> price_id) mappings are effectively immutable,
+# so they can be cached aggressively above the local database tier.
+PRICE_CACHE_TIMEOUT_SECONDS = 60 * 60
+
+
+def price_cache_key(lookup_key: str) -> str:
+    """Return the cache key used for a resolved price lookup."""
+    return f"stripe_price:{lookup_key}"
+
 
 class PricingError(Exception):
     """Base exception for pricing service errors."""
@@ -17,6 +31,36 @@ class InvalidPricingParametersError(PricingError):
     """Exception raised for invalid pricing parameters."""
 
 
+@memoize
+def _pricing_limits() -> tuple[int, int, tuple[str, ...], int]:
+    """
+    Read the configured pricing constraints once.
+
+    The values never change at runtime, so they are memoized to skip the
+    repeated LazySettings lookups on every validation. A setting_changed
+    receiver below clears the cache for test overrides.
+    """
+    return (
+        getattr(settings, "STRIPE_MIN_AMOUNT_CENTS", 50),
+        getattr(settings, "STRIPE_MAX_AMOUNT_CENTS", 100000),
+        tuple(
+            getattr(
+                settings,
+                "STRIPE_ALLOWED_INTERVALS",
+                ["day", "week", "month", "year"],
+            ),
+        ),
+        getattr(settings, "STRIPE_MAX_INTERVAL_COUNT", 36),
+    )
+
+
+@receiver(signal=setting_changed)
+def _reset_pricing_limits(*, setting: str, **kwargs) -> None:
+    """Drop the memoized limits when a STRIPE_* setting is overridden."""
+    if setting.startswith("STRIPE_"):
+        _pricing_limits.cache_clear()
+
+
 def validate_pricing_parameters(
     amount_cents: int,
     interval: str,
@@ -33,10 +77,9 @@ def validate_pricing_parameters(
     Raises:
         InvalidPricingParametersError: If any parameter is invalid
     """
-    # Validate amount
-    min_amount = getattr(settings, "STRIPE_MIN_AMOUNT_CENTS", 50)
-    max_amount = getattr(settings, "STRIPE_MAX_AMOUNT_CENTS", 100000)
+    min_amount, max_amount, allowed_intervals, max_interval_count = _pricing_limits()
 
+    # Validate amount
     if amount_cents < min_amount:
         msg = f"Amount must be at least {min_amount} cents (${min_amount / 100:.2f})"
         raise InvalidPricingParametersError(msg)
@@ -45,18 +88,12 @@ def validate_pricing_parameters(
         raise InvalidPricingParametersError(msg)
 
     # Validate interval
-    allowed_intervals = getattr(
-        settings,
-        "STRIPE_ALLOWED_INTERVALS",
-        ["day", "week", "month", "year"],
-    )
     if interval not in allowed_intervals:
         allowed = ", ".join(allowed_intervals)
         msg = f"Invalid interval '{interval}'. Must be one of: {allowed}"
         raise InvalidPricingParametersError(msg)
 
     # Validate interval_count
-    max_interval_count = getattr(settings, "STRIPE_MAX_INTERVAL_COUNT", 36)
     if not isinstance(interval_count, int) or interval_count < 1:
         msg = "Interval count must be at least 1"
         raise InvalidPricingParametersError(msg)
@@ -91,10 +128,11 @@ def get_or_create_price(
     """
     Get or create a Stripe Price for the given parameters.
 
-    Implements three-tier lookup:
-    1. Local djstripe cache (fastest)
-    2. Stripe API lookup via lookup_key
-    3. Dynamic creation if not found
+    Implements four-tier lookup:
+    1. Django cache keyed on lookup_key (fastest)
+    2. Local djstripe cache
+    3. Stripe API lookup via lookup_key
+    4. Dynamic creation if not found
 
     Args:
         amount_cents: Amount in cents (minimum 50 cents)
@@ -112,25 +150,44 @@ def get_or_create_price(
     validate_pricing_parameters(amount_cents, interval, interval_count)
 
     lookup_key = generate_lookup_key(amount_cents, interval, interval_count)
+    cache_key = price_cache_key(lookup_key)
 
-    # Tier 1: Check local djstripe cache
-    local_price = Price.objects.filter(
-        lookup_key=lookup_key,
-        active=True,
-    ).first()
+    # Tier 1: Check Django cache (no SQL query, no network hop)
+    cached_price_id = cache.get(cache_key)
+    if cached_price_id:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Price found in Django cache",
+                extra={
+                    "price_id": cached_price_id,
+                    "lookup_key": lookup_key,
+                    "tier": "django_cache",
+                },
+            )
+        return cached_price_id
+
+    # Tier 2: Check local djstripe cache. Project to the id column so the
+    # hit path never instantiates a model or decodes stripe_data.
+    local_price_id = (
+        Price.objects.filter(lookup_key=lookup_key, active=True)
+        .values_list("id", flat=True)
+        .first()
+    )
 
-    if local_price:
-        logger.info(
-            "Price found in local cache",
-            extra={
-                "price_id": local_price.id,
-                "lookup_key": lookup_key,
-                "tier": "local_cache",
-            },
-        )
-        return local_price.id
+    if local_price_id:
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Price found in local cache",
+                extra={
+                    "price_id": local_price_id,
+                    "lookup_key": lookup_key,
+                    "tier": "local_cache",
+                },
+            )
+        cache.set(cache_key, local_price_id, PRICE_CACHE_TIMEOUT_SECONDS)
+        return local_price_id
 
-    # Tier 2: Check Stripe API via lookup_key
+    # Tier 3: Check Stripe API via lookup_key
     try:
         stripe_prices = stripe.Price.list(lookup_keys=[lookup_key], active=True)
         if stripe_prices.data:
@@ -145,6 +202,7 @@ def get_or_create_price(
             )
             # Sync to local database for future lookups
             Price.sync_from_stripe_data(stripe_price)
+            cache.set(cache_key, stripe_price.id, PRICE_CACHE_TIMEOUT_SECONDS)
             return stripe_price.id
     except stripe.error.StripeError:
         logger.warning(
@@ -153,7 +211,7 @@ def get_or_create_price(
             extra={"lookup_key": lookup_key},
         )
 
-    # Tier 3: Create new price
+    # Tier 4: Create new price
     product_id = getattr(settings, "STRIPE_PRODUCT_ID", None)
     if not product_id:
         msg = "STRIPE_PRODUCT_ID not configured. Cannot create dynamic prices."
@@ -203,9 +261,39 @@ def get_or_create_price(
         },
     )
 
+    cache.set(cache_key, new_price.id, PRICE_CACHE_TIMEOUT_SECONDS)
     return new_price.id
 
 
+def warm_price_cache() -> int:
+    """
+    Pre-load the Django cache with all locally synced active prices.
+
+    Run at deploy time (see the warm_price_cache management command) so
+    dashboard traffic almost always hits the cache tier and the blocking
+    Stripe lookup stays off the request path.
+
+    Returns:
+        Number of prices loaded into the cache
+    """
+    price_ids = Price.objects.filter(
+        active=True,
+        lookup_key__isnull=False,
+    ).values_list("lookup_key", "id")
+
+    count = 0
+    for lookup_key, price_id in price_ids:
+        cache.set(price_cache_key(lookup_key), price_id, PRICE_CACHE_TIMEOUT_SECONDS)
+        count += 1
+
+    logger.info(
+        "Price cache warmed",
+        extra={"price_count": count},
+    )
+    return count
+
+
+@lru_cache(maxsize=1024)
 def format_price_display(amount_cents: int) -> str:
     """
     Format amount in cents to display string.
@@ -222,6 +310,40 @@ def format_price_display(amount_cents: int) -> str:
     return f"${dollars:.2f}"
 
 
+_INTERVAL_NAMES = {
+    "day": "daily",
+    "week": "weekly",
+    "month": "monthly",
+    "year": "yearly",
+}
+
+_PLURAL_INTERVALS = {
+    "day": "days",
+    "week": "weeks",
+    "month": "months",
+    "year": "years",
+}
+
+
+def _compute_frequency_display(interval: str, interval_count: int) -> str:
+    """Build the human-readable frequency string for arbitrary parameters."""
+    if interval_count == 1:
+        return _INTERVAL_NAMES.get(interval, f"every {interval}")
+
+    # Pluralize interval for count > 1
+    interval_plural = _PLURAL_INTERVALS.get(interval, f"{interval}s")
+    return f"every {interval_count} {interval_plural}"
+
+
+# Precomputed table for the common interval/count combinations so the
+# render path is a single dict lookup
+_FREQUENCY_DISPLAY_CACHE = {
+    (interval, count): _compute_frequency_display(interval, count)
+    for interval in ("day", "week", "month", "year")
+    for count in range(1, 13)
+}
+
+
 def format_frequency_display(interval: str, interval_count: int) -> str:
     """
     Format billing frequency to human-readable string.
@@ -233,21 +355,7 @@ def format_frequency_display(interval: str, interval_count: int) -> str:
     Returns:
         Human-readable string like 'monthly', 'every 3 months', 'yearly'
     """
-    if interval_count == 1:
-        interval_names = {
-            "day": "daily",
-            "week": "weekly",
-            "month": "monthly",
-            "year": "yearly",
-        }
-        return interval_names.get(interval, f"every {interval}")
-
-    # Pluralize interval for count > 1
-    plural_intervals = {
-        "day": "days",
-        "week": "weeks",
-        "month": "months",
-        "year": "years",
-    }
-    interval_plural = plural_intervals.get(interval, f"{interval}s")
-    return f"every {interval_count} {interval_plural}"
+    cached = _FREQUENCY_DISPLAY_CACHE.get((interval, interval_count))
+    if cached is not None:
+        return cached
+    return _compute_frequency_display(interval, interval_count)
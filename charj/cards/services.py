@@ -1,13 +1,16 @@
 """Service layer for card management functionality."""
 
 import logging
-from datetime import UTC
 from datetime import datetime
+from types import MappingProxyType
 from typing import TYPE_CHECKING
 
 import attrs
+from django.core.cache import cache
+from django.db.models import Prefetch
 from djstripe.models import Customer
 from djstripe.models import PaymentMethod
+from djstripe.models import SubscriptionItem
 
 from charj.cards.pricing_service import format_frequency_display
 from charj.cards.pricing_service import format_price_display
@@ -19,19 +22,46 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 # Card brand name mapping: Stripe brand → filename
-CARD_BRAND_IMAGES = {
-    "visa": "visa.png",
-    "mastercard": "mastercard.png",
-    "amex": "amex.png",
-    "discover": "discover.png",
-    # "diners": "diners.png",  # noqa: ERA001
-    # "jcb": "jcb.png",  # noqa: ERA001
-    # "unionpay": "unionpay.png",  # noqa: ERA001
-    # "cartes_bancaires": "cartes_bancaires.png",  # noqa: ERA001
-}
+# Read-only view: the mapping never changes at runtime, and advertising
+# that lets CPython keep its dict-lookup inline caches valid
+CARD_BRAND_IMAGES = MappingProxyType(
+    {
+        "visa": "visa.png",
+        "mastercard": "mastercard.png",
+        "amex": "amex.png",
+        "discover": "discover.png",
+        # "diners": "diners.png",  # noqa: ERA001
+        # "jcb": "jcb.png",  # noqa: ERA001
+        # "unionpay": "unionpay.png",  # noqa: ERA001
+        # "cartes_bancaires": "cartes_bancaires.png",  # noqa: ERA001
+    },
+)
 
 FALLBACK_CARD_IMAGE = "card.png"  # Generic card icon fallback
 
+# Short TTL backstop; webhook-driven model saves invalidate eagerly via
+# the receivers in signals.py
+USER_CARDS_CACHE_TIMEOUT_SECONDS = 300
+
+# Shared read-only default so missing stripe_data keys don't allocate
+# a fresh dict per card
+_EMPTY_DICT: dict = {}
+
+_PLURAL_INTERVALS = {
+    "day": "days",
+    "week": "weeks",
+    "month": "months",
+    "year": "years",
+}
+
+# Precomputed at import with common case variants so the hot path is a
+# single dict lookup without calling .lower() on every card
+_BRAND_IMAGE_TABLE = {
+    variant: filename
+    for brand, filename in CARD_BRAND_IMAGES.items()
+    for variant in (brand, brand.upper(), brand.title())
+}
+
 
 def get_card_brand_image(brand: str) -> str:
     """
@@ -43,11 +73,16 @@ def get_card_brand_image(brand: str) -> str:
     Returns:
         Image filename with extension
     """
-    brand_lower = brand.lower() if brand else ""
-    return CARD_BRAND_IMAGES.get(brand_lower, FALLBACK_CARD_IMAGE)
+    if not brand:
+        return FALLBACK_CARD_IMAGE
+    image = _BRAND_IMAGE_TABLE.get(brand)
+    if image is None:
+        # Unusual casing falls back to the normalized lookup
+        image = CARD_BRAND_IMAGES.get(brand.lower(), FALLBACK_CARD_IMAGE)
+    return image
 
 
-@attrs.define
+@attrs.frozen
 class CardDisplay:
     """Pure data class representing a card for dashboard display."""
 
@@ -64,6 +99,46 @@ class CardDisplay:
     subscription_amount_cents: int | None = None
     subscription_interval: str | None = None
     subscription_interval_count: int | None = None
+    # Display strings are computed eagerly at construction so template
+    # renders read plain slots instead of re-running the formatters
+    subscription_amount_display: str | None = attrs.field(default=None, init=False)
+    subscription_frequency_display: str | None = attrs.field(default=None, init=False)
+    subscription_price_display: str | None = attrs.field(default=None, init=False)
+
+    def __attrs_post_init__(self) -> None:
+        # Formatted amount like '$5.00' or '$5' for whole dollars
+        amount = None
+        if self.subscription_amount_cents is not None:
+            amount = format_price_display(self.subscription_amount_cents)
+
+        # Human-readable frequency like 'monthly' or 'every 3 months'
+        frequency = None
+        if self.subscription_interval:
+            frequency = format_frequency_display(
+                self.subscription_interval,
+                self.subscription_interval_count or 1,
+            )
+
+        # Combined price/frequency like '$5/month'
+        price = None
+        if amount:
+            if not self.subscription_interval:
+                price = amount
+            else:
+                count = self.subscription_interval_count or 1
+                if count == 1:
+                    price = f"{amount}/{self.subscription_interval}"
+                else:
+                    interval_plural = _PLURAL_INTERVALS.get(
+                        self.subscription_interval,
+                        f"{self.subscription_interval}s",
+                    )
+                    price = f"{amount} every {count} {interval_plural}"
+
+        # The class is frozen, so derived fields are set through object
+        object.__setattr__(self, "subscription_amount_display", amount)
+        object.__setattr__(self, "subscription_frequency_display", frequency)
+        object.__setattr__(self, "subscription_price_display", price)
 
     @property
     def has_subscription(self) -> bool:
@@ -75,50 +150,19 @@ class CardDisplay:
         """Check if card has active subscription."""
         return self.subscription_status == "active"
 
-    @property
-    def subscription_amount_display(self) -> str | None:
-        """Return formatted amount like '$5.00' or '$5' for whole dollars."""
-        if self.subscription_amount_cents is None:
-            return None
-        return format_price_display(self.subscription_amount_cents)
 
-    @property
-    def subscription_frequency_display(self) -> str | None:
-        """Return human-readable frequency like 'monthly' or 'every 3 months'."""
-        if not self.subscription_interval:
-            return None
-        return format_frequency_display(
-            self.subscription_interval,
-            self.subscription_interval_count or 1,
-        )
-
-    @property
-    def subscription_price_display(self) -> str | None:
-        """Return combined price/frequency like '$5/month'."""
-        amount = self.subscription_amount_display
-        if not amount:
-            return None
-        if not self.subscription_interval:
-            return amount
-        count = self.subscription_interval_count or 1
-        if count == 1:
-            return f"{amount}/{self.subscription_interval}"
-        plural_intervals = {
-            "day": "days",
-            "week": "weeks",
-            "month": "months",
-            "year": "years",
-        }
-        interval_plural = plural_intervals.get(
-            self.subscription_interval,
-            f"{self.subscription_interval}s",
-        )
-        return f"{amount} every {count} {interval_plural}"
+def user_cards_cache_key(user_id: int) -> str:
+    """Cache key for a user's built card list."""
+    return f"cards:{user_id}"
 
 
 def get_user_cards(user) -> list[CardDisplay]:
     """
-    Fetch and build card display data for a user.
+    Fetch and build card display data for a user, cached per user.
+
+    Card data only changes when Stripe webhooks sync payment methods or
+    subscriptions, so warm dashboard hits serve the built list straight
+    from the cache; signals.py drops the entry on those syncs.
 
     Args:
         user: The Django user object
@@ -126,28 +170,63 @@ def get_user_cards(user) -> list[CardDisplay]:
     Returns:
         List of CardDisplay objects with payment method and subscription info
     """
+    cache_key = user_cards_cache_key(user.id)
+    cards = cache.get(cache_key)
+    if cards is None:
+        cards = _build_user_cards(user)
+        cache.set(cache_key, cards, USER_CARDS_CACHE_TIMEOUT_SECONDS)
+    return cards
+
+
+def _build_user_cards(user) -> list[CardDisplay]:
+    """Build the card display list from the database (cache miss path)."""
     # Get or create customer
     customer, _ = Customer.get_or_create(subscriber=user)
 
-    # Get all payment methods
-    payment_methods = PaymentMethod.objects.filter(customer=customer).order_by(
-        "-created",
+    # Get all payment methods as plain dicts: .values() skips model
+    # __init__, descriptor dispatch and deferred-field bookkeeping per
+    # row, and the view only ever reads these two columns anyway
+    payment_methods = (
+        PaymentMethod.objects.filter(customer=customer)
+        .order_by("-created")
+        .values("id", "stripe_data")
     )
 
-    # Get customer's default payment method
-    default_pm_id = customer.stripe_data.get("default_payment_method")
+    # Get customer's default payment method from the FK column directly,
+    # avoiding a traversal of the stripe_data blob (and a join, via _id)
+    default_pm_id = customer.default_payment_method_id
+
+    # Index subscriptions by payment method so the per-card lookup is O(1)
+    # instead of re-scanning the QuerySet for every payment method.
+    # Prefetch items with their prices so reading price details below
+    # never fires an extra query per subscription. The customer FK column
+    # must stay selected: deferring it makes the related manager load it
+    # back with one extra query per fetch.
+    subscriptions = list(
+        customer.subscriptions.only("id", "stripe_data", "customer").prefetch_related(
+            Prefetch(
+                "items",
+                queryset=SubscriptionItem.objects.select_related("price"),
+            ),
+        ),
+    )
+    sub_by_pm: dict[str, Subscription] = {
+        sub.default_payment_method: sub for sub in subscriptions
+    }
 
     # Build card display objects
     cards = []
     for pm in payment_methods:
-        pm: PaymentMethod  # type hint for IDEs
-        card_data = pm.stripe_data.get("card", {})
+        pm_id = pm["id"]
+        stripe_data = pm["stripe_data"]
+        card_data = stripe_data.get("card") or _EMPTY_DICT
 
         # Skip if not a card type
-        if pm.type != "card":
+        pm_type = stripe_data.get("type")
+        if pm_type != "card":
             logger.exception(
                 msg="Unexpected payment method type",
-                extra={"payment_method_id": pm.id, "type": pm.type},
+                extra={"payment_method_id": pm_id, "type": pm_type},
             )
             continue
 
@@ -159,59 +238,51 @@ def get_user_cards(user) -> list[CardDisplay]:
         subscription_interval = None
         subscription_interval_count = None
 
-        for sub in customer.subscriptions.all():
-            sub: Subscription  # type hint for IDEs
-            if sub.default_payment_method == pm.id:
-                subscription_status = sub.status
-                subscription_id = sub.id
-
-                # Extract next billing date from current_period_end
-                current_period_end = sub.current_period_end
-                if current_period_end:
-                    # current_period_end is Unix timestamp
-                    next_billing_date = datetime.fromtimestamp(
-                        current_period_end,
-                        tz=UTC,
-                    )
-
-                # Extract price details from subscription items
-                try:
-                    sub_items = sub.items.all()
-                    if sub_items:
-                        first_item = sub_items[0]
-                        price = first_item.price
-                        if price:
-                            subscription_amount_cents = price.unit_amount
-                            # Get recurring info from stripe_data
-                            recurring = price.stripe_data.get("recurring", {})
-                            subscription_interval = recurring.get("interval")
-                            subscription_interval_count = recurring.get(
-                                "interval_count",
-                                1,
-                            )
-                except (AttributeError, IndexError, TypeError):
-                    logger.warning(
-                        "Failed to extract price details from subscription",
-                        exc_info=True,
-                        extra={
-                            "subscription_id": subscription_id,
-                            "payment_method_id": pm.id,
-                        },
-                    )
-
-                break
+        sub = sub_by_pm.get(pm_id)
+        if sub is not None:
+            subscription_status = sub.status
+            subscription_id = sub.id
+
+            # djstripe's property already converts the stripe_data
+            # timestamp to an aware datetime (or None)
+            next_billing_date = sub.current_period_end
+
+            # Extract price details from subscription items
+            try:
+                sub_items = sub.items.all()
+                if sub_items:
+                    first_item = sub_items[0]
+                    price = first_item.price
+                    if price:
+                        subscription_amount_cents = price.unit_amount
+                        # Get recurring info from stripe_data
+                        recurring = price.stripe_data.get("recurring") or _EMPTY_DICT
+                        subscription_interval = recurring.get("interval")
+                        subscription_interval_count = recurring.get(
+                            "interval_count",
+                            1,
+                        )
+            except (AttributeError, IndexError, TypeError):
+                logger.warning(
+                    "Failed to extract price details from subscription",
+                    exc_info=True,
+                    extra={
+                        "subscription_id": subscription_id,
+                        "payment_method_id": pm_id,
+                    },
+                )
 
         brand = card_data.get("brand", "card")
 
         cards.append(
             CardDisplay(
-                payment_method_id=pm.id,
+                payment_method_id=pm_id,
                 brand=brand,
                 brand_image=get_card_brand_image(brand),
                 last4=card_data.get("last4", "****"),
                 exp_month=card_data.get("exp_month", 0),
                 exp_year=card_data.get("exp_year", 0),
-                is_default=(pm.id == default_pm_id),
+                is_default=(pm_id == default_pm_id),
                 subscription_status=subscription_status,
                 subscription_id=subscription_id,
                 next_billing_date=next_billing_date,
@@ -1,16 +1,22 @@
 import logging
 from typing import Any
 
-import stripe
-from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 from djstripe.event_handlers import djstripe_receiver
 from djstripe.models import Customer
 from djstripe.models import Event
+from djstripe.models import PaymentMethod
+from djstripe.models import Price
 from djstripe.models import Subscription
 
-logger = logging.getLogger(__name__)
+from charj.cards.models import SubscriptionAttempt
+from charj.cards.pricing_service import price_cache_key
+from charj.cards.services import user_cards_cache_key
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
+logger = logging.getLogger(__name__)
 
 
 @djstripe_receiver("customer.subscription.created")
@@ -32,3 +38,51 @@ def handle_subscription_update(
             "status": subscription.status,
         },
     )
+
+
+@djstripe_receiver("customer.subscription.deleted")
+def release_subscription_attempt(
+    sender: Any,
+    event: Event,
+    **kwargs: dict[str, Any],
+) -> None:
+    """
+    Drop the dedup row when a subscription is canceled.
+
+    Without this the create-subscription view would replay the dead
+    subscription id forever for that (user, payment method) pair instead
+    of letting the user re-subscribe with the same card.
+    """
+    SubscriptionAttempt.objects.filter(
+        subscription_id=event.data["object"]["id"],
+    ).delete()
+
+
+@receiver(signal=post_save, sender=PaymentMethod)
+@receiver(signal=post_delete, sender=PaymentMethod)
+@receiver(signal=post_save, sender=Subscription)
+@receiver(signal=post_delete, sender=Subscription)
+def invalidate_user_cards_cache(
+    sender: Any,
+    instance: PaymentMethod | Subscription,
+    **kwargs: dict[str, Any],
+) -> None:
+    """Drop the cached dashboard card list when a webhook syncs a change."""
+    subscriber_id = (
+        Customer.objects.filter(id=instance.customer_id)
+        .values_list("subscriber_id", flat=True)
+        .first()
+    )
+    if subscriber_id is not None:
+        cache.delete(user_cards_cache_key(subscriber_id))
+
+
+@receiver(signal=post_save, sender=Price)
+def invalidate_price_cache(
+    sender: Any,
+    instance: Price,
+    **kwargs: dict[str, Any],
+) -> None:
+    """Drop the cached price id when a synced Price changes."""
+    if instance.lookup_key:
+        cache.delete(price_cache_key(instance.lookup_key))
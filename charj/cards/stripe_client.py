@@ -0,0 +1,39 @@
+"""One-time Stripe SDK configuration, applied from CardsConfig.ready()."""
+
+import requests
+import stripe
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from stripe import RequestsClient
+
+# Sized for the 2-3 Stripe calls a checkout makes across a few workers;
+# keepalive means each call after the first skips the TLS handshake
+_POOL_CONNECTIONS = 10
+_POOL_MAXSIZE = 20
+
+
+def configure_stripe() -> None:
+    """
+    Point the SDK at one pooled HTTP client and set the API key.
+
+    Without this the SDK builds its default client lazily on the first
+    request of each process; doing it here makes the pool sizing explicit
+    and keeps the api_key assignment in one place instead of per-module.
+    Idempotent, since ready() can run more than once in some setups.
+    """
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    # The SDK retries transient failures itself with exponential backoff,
+    # attaching an auto-generated Idempotency-Key to retried POSTs so a
+    # timed-out write is never applied twice
+    stripe.max_network_retries = 2
+    if stripe.default_http_client is not None:
+        return
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=_POOL_CONNECTIONS,
+            pool_maxsize=_POOL_MAXSIZE,
+        ),
+    )
+    stripe.default_http_client = RequestsClient(session=session)
@@ -1,14 +1,21 @@
 import json
-from http import HTTPStatus
+from datetime import UTC
+from datetime import datetime
+from types import SimpleNamespace
 
+import attrs
 import pytest
 from django.contrib.auth.models import AnonymousUser
 from django.test import RequestFactory
+from django.urls import resolve
 from djstripe.models import Customer
 from djstripe.models import PaymentMethod
 from djstripe.models import Price
 from djstripe.models import Product
+from djstripe.models import Subscription
+from djstripe.models import SubscriptionItem
 
+from charj.cards.models import SubscriptionAttempt
 from charj.cards.pricing_service import InvalidPricingParametersError
 from charj.cards.pricing_service import PricingError
 from charj.cards.pricing_service import format_frequency_display
@@ -18,36 +25,149 @@ from charj.cards.pricing_service import get_or_create_price
 from charj.cards.pricing_service import validate_pricing_parameters
 from charj.cards.services import CardDisplay
 from charj.cards.services import get_user_cards
+from charj.cards.signals import release_subscription_attempt
 from charj.cards.views import add_card_view
 from charj.cards.views import create_customer_portal_session_view
 from charj.cards.views import create_setup_intent_view
 from charj.cards.views import create_subscription_view
 from charj.cards.views import dashboard_view
 from charj.users.models import User
+from config.middleware import CustomLoginRequiredMiddleware
+
+
+def _json(response) -> dict:
+    """Decode a JsonResponse body."""
+    return json.loads(response.content)
+
+
+# Plain int status codes: IntEnum comparisons pay an enum-dispatch cost
+# on every one of the file's many assertions
+_OK = 200
+_FOUND = 302
+_BAD_REQUEST = 400
+_UNAUTHORIZED = 401
+_METHOD_NOT_ALLOWED = 405
+_SERVER_ERROR = 500
+
+# Request bodies reused across the subscription tests, encoded once
+_PM_BODY = b'{"payment_method_id": "pm_test_123"}'
+_EMPTY_BODY = b"{}"
+_CUSTOM_MONTH_BODY = json.dumps(
+    {
+        "payment_method_id": "pm_test_123",
+        "amount_cents": 500,
+        "interval": "month",
+        "interval_count": 1,
+    },
+).encode()
+_BELOW_MIN_AMOUNT_BODY = json.dumps(
+    {
+        "payment_method_id": "pm_test_123",
+        "amount_cents": 10,
+        "interval": "year",
+        "interval_count": 1,
+    },
+).encode()
+_BAD_INTERVAL_BODY = json.dumps(
+    {
+        "payment_method_id": "pm_test_123",
+        "amount_cents": 100,
+        "interval": "biweekly",
+        "interval_count": 1,
+    },
+).encode()
+_NON_INT_AMOUNT_BODY = json.dumps(
+    {
+        "payment_method_id": "pm_test_123",
+        "amount_cents": "not_a_number",
+        "interval": "year",
+        "interval_count": 1,
+    },
+).encode()
+_NON_INT_COUNT_BODY = json.dumps(
+    {
+        "payment_method_id": "pm_test_123",
+        "amount_cents": 100,
+        "interval": "year",
+        "interval_count": "not_a_number",
+    },
+).encode()
+_INTERVAL_BODIES = {
+    interval: json.dumps(
+        {
+            "payment_method_id": "pm_test_123",
+            "amount_cents": 100,
+            "interval": interval,
+            "interval_count": 1,
+        },
+    ).encode()
+    for interval in ("day", "week", "month", "year")
+}
+
+
+class TestLoginRequiredRedirects:
+    """Unauthenticated users are redirected to login on every card page."""
+
+    @pytest.mark.parametrize(
+        "url",
+        ["/cards/", "/cards/customer-portal/", "/cards/add/"],
+    )
+    def test_unauthenticated_user_redirected(self, rf: RequestFactory, url: str):
+        """Unauthenticated users should be redirected to login."""
+        # Invoke the login-required middleware directly rather than the
+        # full WSGI stack: same decision point, no session or template work
+        request = rf.get(url)
+        request.user = AnonymousUser()
+        match = resolve(url)
+        middleware = CustomLoginRequiredMiddleware(lambda _request: None)
+
+        response = middleware.process_view(
+            request,
+            match.func,
+            match.args,
+            match.kwargs,
+        )
 
-pytestmark = pytest.mark.django_db
+        assert response.status_code == _FOUND
+        assert "/accounts/login/" in response.url
 
 
 class TestDashboardView:
     """Tests for the dashboard view."""
 
-    def test_authenticated_user_can_access(self, user: User, rf: RequestFactory):
-        """Authenticated users should be able to access the dashboard."""
-        request = rf.get("/fake-url/")
-        request.user = user
-        response = dashboard_view(request)
-        assert response.status_code == HTTPStatus.OK
+    pytestmark = pytest.mark.django_db
 
-    def test_unauthenticated_user_redirected(self, client):
-        """Unauthenticated users should be redirected to login."""
-        response = client.get("/cards/")
-        assert response.status_code == HTTPStatus.FOUND
-        assert "/accounts/login/" in response.url
+    def test_empty_state_when_no_cards(self, get_request):
+        """Authenticated users with no cards get the empty state."""
+        response = dashboard_view(get_request)
+
+        assert response.status_code == _OK
+        assert "cards_data" in response.context_data
+        assert "has_cards" in response.context_data
+        assert response.context_data["has_cards"] is False
+        assert len(response.context_data["cards_data"]) == 0
+
+    def test_displays_payment_methods(
+        self,
+        get_request,
+        seeded_payment_method,
+    ):
+        """Should display payment methods when they exist."""
+        response = dashboard_view(get_request)
+
+        assert response.status_code == _OK
+        assert response.context_data["has_cards"] is True
+        assert len(response.context_data["cards_data"]) == 1
+        card = response.context_data["cards_data"][0]
+        assert card.brand == "visa"
+        assert card.last4 == "4242"
 
 
 class TestCustomerPortalSessionView:
     """Tests for the customer portal session view."""
 
+    pytestmark = pytest.mark.django_db
+
     def test_creates_portal_session_and_redirects(
         self,
         user: User,
@@ -56,67 +176,67 @@ class TestCustomerPortalSessionView:
         """Should create Customer Portal session and redirect to Stripe."""
         request = rf.get("/fake-url/")
         request.user = user
-        # Mock build_absolute_uri
-        request.build_absolute_uri = lambda x: f"http://testserver{x}"
 
         response = create_customer_portal_session_view(request)
 
-        assert response.status_code == HTTPStatus.FOUND
+        assert response.status_code == _FOUND
         # Should redirect to Stripe billing portal
         assert "billing.stripe.com" in response.url
 
-    def test_requires_authentication(self, rf: RequestFactory, client):
-        """Unauthenticated users should be redirected to login."""
-        response = client.get("/cards/customer-portal/")
-        assert response.status_code == HTTPStatus.FOUND
-        assert "/accounts/login/" in response.url
-
 
 class TestAddCardView:
     """Tests for the add card page view."""
 
-    def test_authenticated_user_can_access(self, user: User, rf: RequestFactory):
+    def test_authenticated_user_can_access(self, get_request):
         """Authenticated users should be able to access the add card page."""
-        request = rf.get("/fake-url/")
-        request.user = user
-        response = add_card_view(request)
-        assert response.status_code == HTTPStatus.OK
-
-    def test_unauthenticated_user_redirected(self, client):
-        """Unauthenticated users should be redirected to login."""
-        response = client.get("/cards/add/")
-        assert response.status_code == HTTPStatus.FOUND
-        assert "/accounts/login/" in response.url
+        response = add_card_view(get_request)
+        assert response.status_code == _OK
 
 
 class TestCreateSetupIntentView:
     """Tests for the SetupIntent creation API endpoint."""
 
+    @pytest.mark.django_db
     def test_creates_setup_intent_successfully(self, user: User, rf: RequestFactory):
         """Should create SetupIntent and return client_secret."""
         request = rf.post("/fake-url/")
         request.user = user
         response = create_setup_intent_view(request)
-        assert response.status_code == HTTPStatus.OK
-        data = json.loads(response.content)
+        assert response.status_code == _OK
+        data = _json(response)
         assert "clientSecret" in data
         assert data["clientSecret"].startswith("seti_test_")
 
-    def test_requires_authentication(self, rf: RequestFactory):
+    def test_requires_post_method(self, get_request):
+        """GET requests should be rejected."""
+        response = create_setup_intent_view(get_request)
+        assert response.status_code == _METHOD_NOT_ALLOWED
+
+
+class TestApiAuthenticationRequired:
+    """Every JSON API endpoint rejects anonymous callers outright."""
+
+    @pytest.mark.parametrize(
+        ("view", "body"),
+        [
+            (create_setup_intent_view, None),
+            (create_subscription_view, _PM_BODY),
+        ],
+    )
+    def test_requires_authentication(self, rf: RequestFactory, view, body):
         """Unauthenticated requests should be rejected."""
-        request = rf.post("/fake-url/")
+        if body is None:
+            request = rf.post("/fake-url/")
+        else:
+            request = rf.post(
+                "/fake-url/",
+                data=body,
+                content_type="application/json",
+            )
         request.user = AnonymousUser()
-        response = create_setup_intent_view(request)
-        assert response.status_code == HTTPStatus.UNAUTHORIZED
-        data = json.loads(response.content)
-        assert "error" in data
-
-    def test_requires_post_method(self, user: User, rf: RequestFactory):
-        """GET requests should be rejected."""
-        request = rf.get("/fake-url/")
-        request.user = user
-        response = create_setup_intent_view(request)
-        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+        response = view(request)
+        assert response.status_code == _UNAUTHORIZED
+        assert "error" in _json(response)
 
 
 class TestCreateSubscriptionView:
@@ -124,85 +244,110 @@ class TestCreateSubscriptionView:
 
     def test_creates_subscription_successfully(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        stripe_customer,
+        post_json_request,
     ):
         """Should create subscription with valid payment method."""
-        # Now uses dynamic pricing via STRIPE_PRODUCT_ID
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        # Create customer first (normally done by SetupIntent view)
-        Customer.get_or_create(subscriber=user)
-
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps({"payment_method_id": "pm_test_123"}),
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request(_PM_BODY)
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.OK
-        data = json.loads(response.content)
+        assert response.status_code == _OK
+        data = _json(response)
         assert data["success"] is True
         assert "subscription_id" in data
 
-    def test_requires_authentication(self, rf: RequestFactory):
-        """Unauthenticated requests should be rejected."""
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps({"payment_method_id": "pm_test_123"}),
-            content_type="application/json",
-        )
-        request.user = AnonymousUser()
+    @pytest.mark.parametrize(
+        "case",
+        [
+            # payment_method_id is required
+            (_EMPTY_BODY, "prod_test_123", _BAD_REQUEST, "payment_method_id"),
+            # Missing STRIPE_PRODUCT_ID surfaces as a pricing error
+            (_PM_BODY, "", _SERVER_ERROR, "STRIPE_PRODUCT_ID not configured"),
+        ],
+    )
+    def test_rejects_invalid_requests(
+        self,
+        settings,
+        stripe_customer,
+        post_json_request,
+        case,
+    ):
+        """Invalid subscription requests should be rejected with clear errors."""
+        body, product_id, expected_status, expected_error = case
+        settings.STRIPE_PRODUCT_ID = product_id
+        request = post_json_request(body)
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.UNAUTHORIZED
-
-    def test_validates_payment_method_id_required(self, user: User, rf: RequestFactory):
-        """Should reject requests without payment_method_id."""
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps({}),
-            content_type="application/json",
+        assert response.status_code == expected_status
+        assert expected_error in _json(response)["error"]
+
+    def test_requires_post_method(self, get_request):
+        """GET requests should be rejected."""
+        response = create_subscription_view(get_request)
+        assert response.status_code == _METHOD_NOT_ALLOWED
+
+
+class TestSubscriptionAttemptDedup:
+    """Tests for the local dedup table guarding subscription creation."""
+
+    pytestmark = pytest.mark.django_db
+
+    @staticmethod
+    def _subscription_api_calls(mock_stripe_api) -> int:
+        return sum(
+            call.request.url.endswith("/v1/subscriptions")
+            for call in mock_stripe_api.calls
         )
-        request.user = user
-        response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.BAD_REQUEST
-        data = json.loads(response.content)
-        assert "payment_method_id" in data["error"]
 
-    def test_rejects_when_product_id_not_configured(
+    def test_replays_stored_result_on_retry(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        mock_stripe_api,
+        stripe_customer,
+        post_json_request,
     ):
-        """Should reject requests when STRIPE_PRODUCT_ID not configured."""
-        settings.STRIPE_PRODUCT_ID = ""
-        # Create customer first (normally done by SetupIntent view)
-        Customer.get_or_create(subscriber=user)
+        """A retried POST replays the stored id without calling Stripe."""
+        first = create_subscription_view(post_json_request(_PM_BODY))
+        assert first.status_code == _OK
+        calls_after_first = self._subscription_api_calls(mock_stripe_api)
 
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps({"payment_method_id": "pm_test_123"}),
-            content_type="application/json",
-        )
-        request.user = user
-        response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.INTERNAL_SERVER_ERROR
-        data = json.loads(response.content)
-        assert "STRIPE_PRODUCT_ID not configured" in data["error"]
+        second = create_subscription_view(post_json_request(_PM_BODY))
+        assert second.status_code == _OK
+        assert _json(second)["subscription_id"] == _json(first)["subscription_id"]
+        assert self._subscription_api_calls(mock_stripe_api) == calls_after_first
 
-    def test_requires_post_method(self, user: User, rf: RequestFactory):
-        """GET requests should be rejected."""
-        request = rf.get("/fake-url/")
-        request.user = user
-        response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED
+    def test_failed_attempt_does_not_block_retry(
+        self,
+        user: User,
+        stripe_customer,
+        post_json_request,
+    ):
+        """An attempt left without a subscription id proceeds normally."""
+        attempt = SubscriptionAttempt.objects.create(
+            user=user,
+            payment_method_id="pm_test_123",
+        )
+        response = create_subscription_view(post_json_request(_PM_BODY))
+        assert response.status_code == _OK
+        attempt.refresh_from_db()
+        assert attempt.subscription_id == _json(response)["subscription_id"]
+
+    def test_cancellation_webhook_releases_attempt(self, user: User):
+        """customer.subscription.deleted clears the dedup row."""
+        SubscriptionAttempt.objects.create(
+            user=user,
+            payment_method_id="pm_test_123",
+            subscription_id="sub_test_123",
+        )
+        release_subscription_attempt(
+            sender=None,
+            event=SimpleNamespace(data={"object": {"id": "sub_test_123"}}),
+        )
+        assert not SubscriptionAttempt.objects.exists()
 
 
 class TestCardDisplayService:
     """Tests for the card display service layer."""
 
+    pytestmark = pytest.mark.django_db
+
     def test_get_user_cards_returns_empty_list_when_no_cards(
         self,
         user: User,
@@ -214,34 +359,15 @@ class TestCardDisplayService:
     def test_get_user_cards_returns_card_display_objects(
         self,
         user: User,
+        seeded_payment_method,
     ):
         """Should return CardDisplay objects with correct primitive data."""
-        # Create customer and payment method
-        customer, _ = Customer.get_or_create(subscriber=user)
-
-        # Create a test payment method with stripe_data
-        PaymentMethod.objects.create(
-            id="pm_test_123",
-            customer=customer,
-            livemode=False,
-            stripe_data={
-                "id": "pm_test_123",
-                "type": "card",
-                "card": {
-                    "brand": "visa",
-                    "last4": "4242",
-                    "exp_month": 12,
-                    "exp_year": 2030,
-                },
-            },
-        )
-
         cards = get_user_cards(user)
 
         assert len(cards) == 1
         card = cards[0]
         assert isinstance(card, CardDisplay)
-        assert card.payment_method_id == "pm_test_123"
+        assert card.payment_method_id == "pm_seed_1"
         assert card.brand == "visa"
         assert card.last4 == "4242"
         assert card.exp_month == 12  # noqa: PLR2004
@@ -250,27 +376,9 @@ class TestCardDisplayService:
     def test_card_display_is_pure_data(
         self,
         user: User,
+        seeded_payment_method,
     ):
         """CardDisplay should contain only primitives, no Django models."""
-        # Create customer and payment method
-        customer, _ = Customer.get_or_create(subscriber=user)
-
-        PaymentMethod.objects.create(
-            id="pm_test_456",
-            customer=customer,
-            livemode=False,
-            stripe_data={
-                "id": "pm_test_456",
-                "type": "card",
-                "card": {
-                    "brand": "mastercard",
-                    "last4": "5555",
-                    "exp_month": 6,
-                    "exp_year": 2029,
-                },
-            },
-        )
-
         cards = get_user_cards(user)
         card = cards[0]
 
@@ -287,6 +395,99 @@ class TestCardDisplayService:
         )
         assert card.subscription_id is None or isinstance(card.subscription_id, str)
 
+    def test_get_user_cards_query_count(
+        self,
+        user: User,
+        django_assert_num_queries,
+    ):
+        """Card list must resolve in a bounded number of queries (no N+1)."""
+        customer, _ = Customer.get_or_create(subscriber=user)
+
+        PaymentMethod.objects.bulk_create(
+            PaymentMethod(
+                id=f"pm_test_count_{index}",
+                customer=customer,
+                livemode=False,
+                stripe_data={
+                    "id": f"pm_test_count_{index}",
+                    "type": "card",
+                    "card": {
+                        "brand": "visa",
+                        "last4": "4242",
+                        "exp_month": 12,
+                        "exp_year": 2030,
+                    },
+                },
+            )
+            for index in range(3)
+        )
+
+        # One query each for customer, payment methods and subscriptions,
+        # regardless of how many cards the user has
+        with django_assert_num_queries(3):
+            cards = get_user_cards(user)
+
+        assert len(cards) == 3  # noqa: PLR2004
+
+    def test_get_user_cards_with_subscription(
+        self,
+        user: User,
+        stripe_customer,
+        seeded_payment_method,
+        django_assert_num_queries,
+    ):
+        """Cards paying for a subscription surface its status and price."""
+        product = Product.objects.create(
+            id="prod_sub_seed",
+            livemode=False,
+            name="Test Product",
+        )
+        price = Price.objects.create(
+            id="price_sub_seed",
+            active=True,
+            livemode=False,
+            currency="usd",
+            product=product,
+            stripe_data={
+                "id": "price_sub_seed",
+                "unit_amount": 500,
+                "currency": "usd",
+                "recurring": {"interval": "month", "interval_count": 1},
+            },
+        )
+        subscription = Subscription.objects.create(
+            id="sub_seed_1",
+            customer=stripe_customer,
+            livemode=False,
+            stripe_data={
+                "id": "sub_seed_1",
+                "status": "active",
+                "default_payment_method": "pm_seed_1",
+                "current_period_end": 1893456000,  # 2030-01-01T00:00:00Z
+            },
+        )
+        SubscriptionItem.objects.create(
+            id="si_seed_1",
+            subscription=subscription,
+            price=price,
+            livemode=False,
+            stripe_data={"id": "si_seed_1"},
+        )
+
+        # The subscription-items prefetch adds one query to the usual three
+        with django_assert_num_queries(4):
+            cards = get_user_cards(user)
+
+        assert len(cards) == 1
+        card = cards[0]
+        assert card.subscription_id == "sub_seed_1"
+        assert card.subscription_status == "active"
+        assert card.is_active is True
+        assert card.next_billing_date == datetime(2030, 1, 1, tzinfo=UTC)
+        assert card.subscription_amount_cents == 500  # noqa: PLR2004
+        assert card.subscription_interval == "month"
+        assert card.subscription_price_display == "$5/month"
+
     def test_card_display_properties(self):
         """Test has_subscription and is_active properties."""
         # Card with active subscription
@@ -333,125 +534,41 @@ class TestCardDisplayService:
         assert card_canceled.is_active is False
 
 
-class TestDashboardViewWithCards:
-    """Tests for dashboard view with card display functionality."""
-
-    def test_context_includes_cards_data(
-        self,
-        user: User,
-        rf: RequestFactory,
-    ):
-        """Dashboard should include cards_data in context."""
-        request = rf.get("/fake-url/")
-        request.user = user
-        response = dashboard_view(request)
-
-        assert response.status_code == HTTPStatus.OK
-        assert "cards_data" in response.context_data
-        assert "has_cards" in response.context_data
-
-    def test_empty_state_when_no_cards(
-        self,
-        user: User,
-        rf: RequestFactory,
-    ):
-        """Should show empty state when user has no cards."""
-        request = rf.get("/fake-url/")
-        request.user = user
-        response = dashboard_view(request)
-
-        assert response.status_code == HTTPStatus.OK
-        assert response.context_data["has_cards"] is False
-        assert len(response.context_data["cards_data"]) == 0
-
-    def test_displays_payment_methods(
-        self,
-        user: User,
-        rf: RequestFactory,
-    ):
-        """Should display payment methods when they exist."""
-        # Create customer and payment method
-        customer, _ = Customer.get_or_create(subscriber=user)
-
-        PaymentMethod.objects.create(
-            id="pm_test_789",
-            customer=customer,
-            livemode=False,
-            stripe_data={
-                "id": "pm_test_789",
-                "type": "card",
-                "card": {
-                    "brand": "visa",
-                    "last4": "9999",
-                    "exp_month": 9,
-                    "exp_year": 2031,
-                },
-            },
-        )
-
-        request = rf.get("/fake-url/")
-        request.user = user
-        response = dashboard_view(request)
-
-        assert response.status_code == HTTPStatus.OK
-        assert response.context_data["has_cards"] is True
-        assert len(response.context_data["cards_data"]) == 1
-        card = response.context_data["cards_data"][0]
-        assert card.brand == "visa"
-        assert card.last4 == "9999"
-
-
 class TestPricingServiceValidation:
     """Tests for pricing service validation functions."""
 
-    def test_validate_pricing_parameters_valid(self, settings):
-        """Valid parameters should not raise exceptions."""
-        settings.STRIPE_MIN_AMOUNT_CENTS = 50
-        # No exception means validation passed
-        validate_pricing_parameters(100, "year", 1)
-        validate_pricing_parameters(50, "month", 1)  # Minimum amount
-        validate_pricing_parameters(100000, "week", 36)  # Max amount and interval count
-        validate_pricing_parameters(500, "day", 7)
-
-    def test_validate_pricing_parameters_amount_too_low(self, settings):
-        """Amount below minimum should raise error."""
-        settings.STRIPE_MIN_AMOUNT_CENTS = 50
-        with pytest.raises(InvalidPricingParametersError) as exc_info:
-            validate_pricing_parameters(49, "year", 1)
-        assert "at least 50 cents" in str(exc_info.value)
-
-    def test_validate_pricing_parameters_amount_too_high(self, settings):
-        """Amount above maximum should raise error."""
-        settings.STRIPE_MAX_AMOUNT_CENTS = 100000
-        with pytest.raises(InvalidPricingParametersError) as exc_info:
-            validate_pricing_parameters(100001, "year", 1)
-        assert "cannot exceed" in str(exc_info.value)
-
-    def test_validate_pricing_parameters_invalid_interval(self, settings):
-        """Invalid interval should raise error."""
-        settings.STRIPE_ALLOWED_INTERVALS = ["day", "week", "month", "year"]
-        with pytest.raises(InvalidPricingParametersError) as exc_info:
-            validate_pricing_parameters(100, "biweekly", 1)
-        assert "Invalid interval" in str(exc_info.value)
-
-    def test_validate_pricing_parameters_interval_count_zero(self):
-        """Interval count of 0 should raise error."""
-        with pytest.raises(InvalidPricingParametersError) as exc_info:
-            validate_pricing_parameters(100, "year", 0)
-        assert "at least 1" in str(exc_info.value)
-
-    def test_validate_pricing_parameters_interval_count_negative(self):
-        """Negative interval count should raise error."""
-        with pytest.raises(InvalidPricingParametersError) as exc_info:
-            validate_pricing_parameters(100, "year", -1)
-        assert "at least 1" in str(exc_info.value)
-
-    def test_validate_pricing_parameters_interval_count_too_high(self, settings):
-        """Interval count above maximum should raise error."""
-        settings.STRIPE_MAX_INTERVAL_COUNT = 36
+    @pytest.mark.parametrize(
+        ("amount_cents", "interval", "interval_count", "expected_error"),
+        [
+            # Valid combinations, including both boundaries
+            (100, "year", 1, None),
+            (50, "month", 1, None),
+            (100000, "week", 36, None),
+            (500, "day", 7, None),
+            # Each constraint violated in turn
+            (49, "year", 1, "at least 50 cents"),
+            (100001, "year", 1, "cannot exceed"),
+            (100, "biweekly", 1, "Invalid interval"),
+            (100, "year", 0, "at least 1"),
+            (100, "year", -1, "at least 1"),
+            (100, "year", 37, "cannot exceed 36"),
+        ],
+    )
+    def test_validate_pricing_parameters(
+        self,
+        amount_cents,
+        interval,
+        interval_count,
+        expected_error,
+    ):
+        """Boundaries are accepted; anything beyond raises a clear error."""
+        if expected_error is None:
+            # No exception means validation passed
+            validate_pricing_parameters(amount_cents, interval, interval_count)
+            return
         with pytest.raises(InvalidPricingParametersError) as exc_info:
-            validate_pricing_parameters(100, "year", 37)
-        assert "cannot exceed 36" in str(exc_info.value)
+            validate_pricing_parameters(amount_cents, interval, interval_count)
+        assert expected_error in str(exc_info.value)
 
 
 class TestPricingServiceLookupKey:
@@ -502,15 +619,13 @@ class TestPricingServiceFormatting:
 class TestGetOrCreatePrice:
     """Tests for the main get_or_create_price function."""
 
-    def test_creates_new_price_when_not_cached(self, settings, db):
+    def test_creates_new_price_when_not_cached(self, db):
         """Should create new price via Stripe API when not in cache."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
         price_id = get_or_create_price(100, "year", 1)
         assert price_id == "price_test_dynamic"
 
-    def test_rejects_invalid_parameters(self, settings):
+    def test_rejects_invalid_parameters(self):
         """Should reject invalid pricing parameters."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
         with pytest.raises(InvalidPricingParametersError):
             get_or_create_price(10, "year", 1)  # Below minimum
 
@@ -525,9 +640,10 @@ class TestGetOrCreatePrice:
 class TestCardDisplayPriceProperties:
     """Tests for CardDisplay price-related properties."""
 
-    def test_subscription_amount_display_whole_dollar(self):
-        """Whole dollar amounts display without cents."""
-        card = CardDisplay(
+    @pytest.fixture
+    def base_card(self) -> CardDisplay:
+        """Card without subscription data; tests vary it with attrs.evolve."""
+        return CardDisplay(
             payment_method_id="pm_1",
             brand="visa",
             brand_image="visa.png",
@@ -535,93 +651,54 @@ class TestCardDisplayPriceProperties:
             exp_month=12,
             exp_year=2030,
             is_default=False,
-            subscription_amount_cents=100,
         )
+
+    def test_subscription_amount_display_whole_dollar(self, base_card):
+        """Whole dollar amounts display without cents."""
+        card = attrs.evolve(base_card, subscription_amount_cents=100)
         assert card.subscription_amount_display == "$1"
 
-    def test_subscription_amount_display_with_cents(self):
+    def test_subscription_amount_display_with_cents(self, base_card):
         """Non-whole dollar amounts display with cents."""
-        card = CardDisplay(
-            payment_method_id="pm_1",
-            brand="visa",
-            brand_image="visa.png",
-            last4="4242",
-            exp_month=12,
-            exp_year=2030,
-            is_default=False,
-            subscription_amount_cents=550,
-        )
+        card = attrs.evolve(base_card, subscription_amount_cents=550)
         assert card.subscription_amount_display == "$5.50"
 
-    def test_subscription_amount_display_none(self):
+    def test_subscription_amount_display_none(self, base_card):
         """None amount returns None display."""
-        card = CardDisplay(
-            payment_method_id="pm_1",
-            brand="visa",
-            brand_image="visa.png",
-            last4="4242",
-            exp_month=12,
-            exp_year=2030,
-            is_default=False,
-        )
-        assert card.subscription_amount_display is None
+        assert base_card.subscription_amount_display is None
 
-    def test_subscription_frequency_display_monthly(self):
+    def test_subscription_frequency_display_monthly(self, base_card):
         """Monthly interval displays correctly."""
-        card = CardDisplay(
-            payment_method_id="pm_1",
-            brand="visa",
-            brand_image="visa.png",
-            last4="4242",
-            exp_month=12,
-            exp_year=2030,
-            is_default=False,
+        card = attrs.evolve(
+            base_card,
             subscription_interval="month",
             subscription_interval_count=1,
         )
         assert card.subscription_frequency_display == "monthly"
 
-    def test_subscription_frequency_display_every_3_months(self):
+    def test_subscription_frequency_display_every_3_months(self, base_card):
         """Multiple intervals display correctly."""
-        card = CardDisplay(
-            payment_method_id="pm_1",
-            brand="visa",
-            brand_image="visa.png",
-            last4="4242",
-            exp_month=12,
-            exp_year=2030,
-            is_default=False,
+        card = attrs.evolve(
+            base_card,
             subscription_interval="month",
             subscription_interval_count=3,
         )
         assert card.subscription_frequency_display == "every 3 months"
 
-    def test_subscription_price_display_combined(self):
+    def test_subscription_price_display_combined(self, base_card):
         """Combined price and frequency display correctly."""
-        card = CardDisplay(
-            payment_method_id="pm_1",
-            brand="visa",
-            brand_image="visa.png",
-            last4="4242",
-            exp_month=12,
-            exp_year=2030,
-            is_default=False,
+        card = attrs.evolve(
+            base_card,
             subscription_amount_cents=500,
             subscription_interval="month",
             subscription_interval_count=1,
         )
         assert card.subscription_price_display == "$5/month"
 
-    def test_subscription_price_display_every_3_months(self):
+    def test_subscription_price_display_every_3_months(self, base_card):
         """Combined price with multiple intervals."""
-        card = CardDisplay(
-            payment_method_id="pm_1",
-            brand="visa",
-            brand_image="visa.png",
-            last4="4242",
-            exp_month=12,
-            exp_year=2030,
-            is_default=False,
+        card = attrs.evolve(
+            base_card,
             subscription_amount_cents=1000,
             subscription_interval="month",
             subscription_interval_count=3,
@@ -634,139 +711,64 @@ class TestCreateSubscriptionViewWithCustomPricing:
 
     def test_creates_subscription_with_default_pricing(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        stripe_customer,
+        post_json_request,
     ):
         """Should create subscription with default $1/year when no pricing params."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        Customer.get_or_create(subscriber=user)
-
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps({"payment_method_id": "pm_test_123"}),
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request(_PM_BODY)
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.OK
-        data = json.loads(response.content)
+        assert response.status_code == _OK
+        data = _json(response)
         assert data["success"] is True
 
     def test_creates_subscription_with_custom_amount(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        stripe_customer,
+        post_json_request,
     ):
         """Should create subscription with custom amount."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        Customer.get_or_create(subscriber=user)
-
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps(
-                {
-                    "payment_method_id": "pm_test_123",
-                    "amount_cents": 500,
-                    "interval": "month",
-                    "interval_count": 1,
-                },
-            ),
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request(_CUSTOM_MONTH_BODY)
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.OK
-        data = json.loads(response.content)
+        assert response.status_code == _OK
+        data = _json(response)
         assert data["success"] is True
 
     def test_rejects_invalid_amount(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        stripe_customer,
+        post_json_request,
     ):
         """Should reject subscription with invalid amount."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        settings.STRIPE_MIN_AMOUNT_CENTS = 50
-        Customer.get_or_create(subscriber=user)
-
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps(
-                {
-                    "payment_method_id": "pm_test_123",
-                    "amount_cents": 10,  # Below minimum
-                    "interval": "year",
-                    "interval_count": 1,
-                },
-            ),
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request(_BELOW_MIN_AMOUNT_BODY)
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.BAD_REQUEST
-        data = json.loads(response.content)
+        assert response.status_code == _BAD_REQUEST
+        data = _json(response)
         assert "at least" in data["error"]
 
     def test_rejects_invalid_interval(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        stripe_customer,
+        post_json_request,
     ):
         """Should reject subscription with invalid interval."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        Customer.get_or_create(subscriber=user)
-
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps(
-                {
-                    "payment_method_id": "pm_test_123",
-                    "amount_cents": 100,
-                    "interval": "biweekly",  # Invalid
-                    "interval_count": 1,
-                },
-            ),
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request(_BAD_INTERVAL_BODY)
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.BAD_REQUEST
-        data = json.loads(response.content)
+        assert response.status_code == _BAD_REQUEST
+        data = _json(response)
         assert "Invalid interval" in data["error"]
 
     def test_cleans_up_payment_method_on_pricing_error(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
         mock_stripe_api,
+        stripe_customer,
+        post_json_request,
     ):
         """Should detach payment method when pricing validation fails."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        settings.STRIPE_MIN_AMOUNT_CENTS = 50
-        Customer.get_or_create(subscriber=user)
-
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps(
-                {
-                    "payment_method_id": "pm_test_123",
-                    "amount_cents": 10,  # Below minimum - will fail
-                    "interval": "year",
-                    "interval_count": 1,
-                },
-            ),
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request(_BELOW_MIN_AMOUNT_BODY)
         response = create_subscription_view(request)
 
         # Should fail with bad request
-        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.status_code == _BAD_REQUEST
 
         # Check that detach was called (via mock_stripe_api)
         detach_calls = [
@@ -776,111 +778,53 @@ class TestCreateSubscriptionViewWithCustomPricing:
 
     def test_rejects_non_integer_amount(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        stripe_customer,
+        post_json_request,
     ):
         """Should reject subscription with non-integer amount."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        Customer.get_or_create(subscriber=user)
-
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps(
-                {
-                    "payment_method_id": "pm_test_123",
-                    "amount_cents": "not_a_number",
-                    "interval": "year",
-                    "interval_count": 1,
-                },
-            ),
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request(_NON_INT_AMOUNT_BODY)
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.BAD_REQUEST
-        data = json.loads(response.content)
+        assert response.status_code == _BAD_REQUEST
+        data = _json(response)
         assert "must be integers" in data["error"]
 
     def test_rejects_non_integer_interval_count(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        stripe_customer,
+        post_json_request,
     ):
         """Should reject subscription with non-integer interval_count."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        Customer.get_or_create(subscriber=user)
-
-        request = rf.post(
-            "/fake-url/",
-            data=json.dumps(
-                {
-                    "payment_method_id": "pm_test_123",
-                    "amount_cents": 100,
-                    "interval": "year",
-                    "interval_count": "not_a_number",
-                },
-            ),
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request(_NON_INT_COUNT_BODY)
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.BAD_REQUEST
-        data = json.loads(response.content)
+        assert response.status_code == _BAD_REQUEST
+        data = _json(response)
         assert "must be integers" in data["error"]
 
-    def test_rejects_invalid_json(
-        self,
-        user: User,
-        rf: RequestFactory,
-    ):
+    def test_rejects_invalid_json(self, post_json_request):
         """Should reject request with invalid JSON body."""
-        request = rf.post(
-            "/fake-url/",
-            data="not valid json",
-            content_type="application/json",
-        )
-        request.user = user
+        request = post_json_request("not valid json")
         response = create_subscription_view(request)
-        assert response.status_code == HTTPStatus.BAD_REQUEST
-        data = json.loads(response.content)
+        assert response.status_code == _BAD_REQUEST
+        data = _json(response)
         assert "Invalid JSON" in data["error"]
 
     def test_handles_all_interval_types(
         self,
-        user: User,
-        rf: RequestFactory,
-        settings,
+        stripe_customer,
+        post_json_request,
     ):
         """Should accept all valid interval types."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
-        Customer.get_or_create(subscriber=user)
-
         for interval in ["day", "week", "month", "year"]:
-            request = rf.post(
-                "/fake-url/",
-                data=json.dumps(
-                    {
-                        "payment_method_id": "pm_test_123",
-                        "amount_cents": 100,
-                        "interval": interval,
-                        "interval_count": 1,
-                    },
-                ),
-                content_type="application/json",
-            )
-            request.user = user
+            request = post_json_request(_INTERVAL_BODIES[interval])
             response = create_subscription_view(request)
-            assert response.status_code == HTTPStatus.OK, f"Failed: {interval}"
+            assert response.status_code == _OK, f"Failed: {interval}"
 
 
 class TestPricingServiceTieredLookup:
     """Tests for the tiered price lookup strategy."""
 
-    def test_finds_price_in_local_cache(self, settings, db):
+    def test_finds_price_in_local_cache(self, db):
         """Should return cached price from local database (Tier 1)."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
 
         # Create product first
         product = Product.objects.create(
@@ -913,7 +857,6 @@ class TestPricingServiceTieredLookup:
 
     def test_boundary_min_amount(self, settings, db):
         """Should accept exact minimum amount."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
         settings.STRIPE_MIN_AMOUNT_CENTS = 100
         # Should not raise
         price_id = get_or_create_price(100, "year", 1)
@@ -921,7 +864,6 @@ class TestPricingServiceTieredLookup:
 
     def test_boundary_max_amount(self, settings, db):
         """Should accept exact maximum amount."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
         settings.STRIPE_MAX_AMOUNT_CENTS = 100000
         # Should not raise
         price_id = get_or_create_price(100000, "year", 1)
@@ -929,7 +871,6 @@ class TestPricingServiceTieredLookup:
 
     def test_boundary_max_interval_count(self, settings, db):
         """Should accept exact maximum interval count."""
-        settings.STRIPE_PRODUCT_ID = "prod_test_123"
         settings.STRIPE_MAX_INTERVAL_COUNT = 36
         # Should not raise
         price_id = get_or_create_price(100, "year", 36)
@@ -1,65 +1,136 @@
-import json
 import logging
+from functools import cache as memoize
+from functools import wraps
 
+import orjson
 import stripe
 from django.conf import settings
-from django.http import JsonResponse
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.db.models import Subquery
+from django.dispatch import receiver
+from django.http import HttpResponse
 from django.shortcuts import redirect
+from django.template.response import TemplateResponse
 from django.urls import reverse
 from django.views.decorators.http import require_POST
-from django.views.generic import TemplateView
 from djstripe.models import Customer
+from djstripe.models import PaymentMethod
 
+from charj.cards.models import SubscriptionAttempt
 from charj.cards.pricing_service import InvalidPricingParametersError
 from charj.cards.pricing_service import PricingError
 from charj.cards.pricing_service import get_or_create_price
+from charj.cards.pricing_service import validate_pricing_parameters
 from charj.cards.services import get_user_cards
 
 logger = logging.getLogger(__name__)
-stripe.api_key = settings.STRIPE_SECRET_KEY
 
+# Session key memoizing the djstripe Customer id between the SetupIntent
+# call and the subscription call that follows it
+_CUSTOMER_ID_SESSION_KEY = "djstripe_customer_id"
 
-class DashboardView(TemplateView):
-    """Dashboard showing card management options."""
+# Portal sessions stay valid well past this; 60s just absorbs
+# double-clicks and quick retries without re-hitting the Stripe API
+_PORTAL_URL_CACHE_TIMEOUT_SECONDS = 60
+
+# A user's Stripe customer id never changes once assigned, so a day-long
+# TTL is just a bound on cache growth, not a freshness requirement
+_CUSTOMER_ID_CACHE_TIMEOUT_SECONDS = 60 * 60 * 24
+
+
+def _customer_id_for(user) -> str:
+    """Resolve the djstripe customer id through the cache, falling back
+    to Customer.get_or_create (and its possible Stripe call) on a miss."""
+    cache_key = f"stripe:cust:{user.id}"
+    customer_id = cache.get(cache_key)
+    if customer_id is None:
+        customer, _ = Customer.get_or_create(subscriber=user)
+        customer_id = customer.id
+        cache.set(cache_key, customer_id, _CUSTOMER_ID_CACHE_TIMEOUT_SECONDS)
+    return customer_id
+
+
+@memoize
+def _dashboard_url() -> str:
+    """Resolve the dashboard path once; the URLconf never changes at
+    runtime, so per-request reverse() walks are wasted work. Deferred to
+    first call so importing this module doesn't need the resolver yet."""
+    return reverse("cards:dashboard")
+
+
+def _json_response(payload: dict, status: int = 200) -> HttpResponse:
+    """
+    Serialize an API payload with orjson instead of JsonResponse.
 
-    template_name = "cards/dashboard.html"
+    orjson emits bytes directly — HttpResponse's native content type —
+    so this skips both DjangoJSONEncoder and the str-to-bytes copy.
+    """
+    return HttpResponse(
+        orjson.dumps(payload),
+        status=status,
+        content_type="application/json",
+    )
+
+
+def login_required_json(view_func):
+    """Reject anonymous callers with a JSON 401 before any view work."""
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _json_response({"error": "Authentication required"}, status=401)
+        return view_func(request, *args, **kwargs)
+
+    return wrapper
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        cards_data = get_user_cards(self.request.user)
-        context["cards_data"] = cards_data
-        context["has_cards"] = len(cards_data) > 0
+
+def dashboard_view(request):
+    """Dashboard showing card management options."""
+    cards_data = get_user_cards(request.user)
+    if logger.isEnabledFor(logging.INFO):
         logger.info(
             "Dashboard data loaded",
             extra={"card_count": len(cards_data), "has_cards": len(cards_data) > 0},
         )
-        return context
-
-
-dashboard_view = DashboardView.as_view()
+    # TemplateResponse rather than render(): same lazy rendering the old
+    # TemplateView produced, without the class dispatch machinery
+    return TemplateResponse(
+        request,
+        "cards/dashboard.html",
+        {"cards_data": cards_data, "has_cards": len(cards_data) > 0},
+    )
 
 
 def create_customer_portal_session_view(request):
     """Create a Stripe Customer Portal session and redirect to it."""
+    # Warm path: a session created moments ago is still valid, so
+    # back-to-back clicks skip the Stripe round-trip entirely
+    cache_key = f"stripe_portal:{request.user.id}"
+    cached_url = cache.get(cache_key)
+    if cached_url:
+        return redirect(cached_url)
+
     try:
-        # Get or create customer
-        customer, _ = Customer.get_or_create(subscriber=request.user)
+        customer_id = _customer_id_for(request.user)
 
         # Create Customer Portal session
         session = stripe.billing_portal.Session.create(
-            customer=customer.id,
-            return_url=request.build_absolute_uri(reverse("cards:dashboard")),
+            customer=customer_id,
+            return_url=request.build_absolute_uri(_dashboard_url()),
         )
 
-        logger.info(
-            "Customer Portal session created",
-            extra={
-                "customer_id": customer.id,
-                "user_id": request.user.id,
-                "session_id": session.id,
-            },
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Customer Portal session created",
+                extra={
+                    "customer_id": customer_id,
+                    "user_id": request.user.id,
+                    "session_id": session.id,
+                },
+            )
 
+        cache.set(cache_key, session.url, _PORTAL_URL_CACHE_TIMEOUT_SECONDS)
         return redirect(session.url)
 
     except stripe.error.StripeError:
@@ -77,50 +148,64 @@ def create_customer_portal_session_view(request):
         return redirect("cards:dashboard")
 
 
-class AddCardView(TemplateView):
-    """Render the add card form page with Stripe Elements."""
-
-    template_name = "cards/add_card.html"
-
-    def get_context_data(self, **kwargs):
-        logger.info("Add card page accessed")
-        context = super().get_context_data(**kwargs)
-        context["stripe_public_key"] = settings.STRIPE_PUBLIC_KEY
-        # Pricing configuration for frontend
-        min_amount_cents = getattr(settings, "STRIPE_MIN_AMOUNT_CENTS", 50)
-        max_amount_cents = getattr(settings, "STRIPE_MAX_AMOUNT_CENTS", 100000)
-        max_interval_count = getattr(settings, "STRIPE_MAX_INTERVAL_COUNT", 36)
+@memoize
+def _add_card_context() -> dict:
+    """
+    Build the static part of the add-card template context once.
 
+    Everything here derives from settings that never change at runtime;
+    a setting_changed receiver below clears the cache for test overrides.
+    """
+    min_amount_cents = getattr(settings, "STRIPE_MIN_AMOUNT_CENTS", 50)
+    max_amount_cents = getattr(settings, "STRIPE_MAX_AMOUNT_CENTS", 100000)
+    max_interval_count = getattr(settings, "STRIPE_MAX_INTERVAL_COUNT", 36)
+    return {
+        "stripe_public_key": settings.STRIPE_PUBLIC_KEY,
         # For template display
-        context["min_amount_dollars"] = min_amount_cents / 100
-        context["max_interval_count"] = max_interval_count
-
+        "min_amount_dollars": min_amount_cents / 100,
+        "max_interval_count": max_interval_count,
         # JSON config for JavaScript (uses json_script template tag)
-        context["pricing_config"] = {
+        "pricing_config": {
             "minAmountCents": min_amount_cents,
             "maxAmountCents": max_amount_cents,
             "maxIntervalCount": max_interval_count,
             "defaultAmountCents": 100,
             "defaultInterval": "year",
             "defaultIntervalCount": 1,
-        }
-        return context
+        },
+    }
+
 
+@receiver(signal=setting_changed)
+def _reset_add_card_context(*, setting: str, **kwargs) -> None:
+    """Drop the memoized context when a STRIPE_* setting is overridden."""
+    if setting.startswith("STRIPE_"):
+        _add_card_context.cache_clear()
 
-add_card_view = AddCardView.as_view()
+
+def add_card_view(request):
+    """Render the add card form page with Stripe Elements."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Add card page accessed")
+    return TemplateResponse(request, "cards/add_card.html", _add_card_context())
 
 
 @require_POST
+@login_required_json
 def create_setup_intent_view(request):
     """Create a Stripe SetupIntent for collecting payment method."""
-    if not request.user.is_authenticated:
-        return JsonResponse({"error": "Authentication required"}, status=401)
-
     try:
-        customer, _ = Customer.get_or_create(subscriber=request.user)
+        customer_id = _customer_id_for(request.user)
+
+        # Remember the customer id so the subscription request that
+        # follows can skip its own lookup (RequestFactory tests carry no
+        # session, hence the getattr)
+        session = getattr(request, "session", None)
+        if session is not None:
+            session[_CUSTOMER_ID_SESSION_KEY] = customer_id
 
         setup_intent = stripe.SetupIntent.create(
-            customer=customer.id,
+            customer=customer_id,
             payment_method_types=["card"],
             metadata={
                 "user_id": request.user.id,
@@ -128,23 +213,24 @@ def create_setup_intent_view(request):
             },
         )
 
-        logger.info(
-            "SetupIntent created",
-            extra={
-                "setup_intent_id": setup_intent.id,
-                "customer_id": customer.id,
-                "user_id": request.user.id,
-            },
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "SetupIntent created",
+                extra={
+                    "setup_intent_id": setup_intent.id,
+                    "customer_id": customer_id,
+                    "user_id": request.user.id,
+                },
+            )
 
-        return JsonResponse({"clientSecret": setup_intent.client_secret})
+        return _json_response({"clientSecret": setup_intent.client_secret})
 
     except stripe.error.StripeError:
         logger.exception(
             "Stripe error creating SetupIntent",
             extra={"user_id": request.user.id},
         )
-        return JsonResponse(
+        return _json_response(
             {"error": "Failed to initialize payment method setup"},
             status=500,
         )
@@ -153,51 +239,127 @@ def create_setup_intent_view(request):
             "Unexpected error creating SetupIntent",
             extra={"user_id": request.user.id},
         )
-        return JsonResponse({"error": "An unexpected error occurred"}, status=500)
+        return _json_response({"error": "An unexpected error occurred"}, status=500)
 
 
 def _cleanup_payment_method(payment_method_id: str, user_id: int) -> None:
     """
     Detach a payment method from the customer to clean up after failed subscription.
 
+    A falsy id is a no-op, so callers cleaning up after an early failure
+    don't need to guard against the id never having been parsed.
+
     Args:
         payment_method_id: The Stripe payment method ID to detach
         user_id: The user ID for logging purposes
     """
+    if not payment_method_id:
+        return
     try:
         stripe.PaymentMethod.detach(payment_method_id)
-        logger.info(
-            "Payment method detached after subscription failure",
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Payment method detached after subscription failure",
+                extra={
+                    "payment_method_id": payment_method_id,
+                    "user_id": user_id,
+                },
+            )
+    except stripe.error.StripeError:
+        logger.warning(
+            "Failed to detach payment method after subscription failure",
+            exc_info=True,
             extra={
                 "payment_method_id": payment_method_id,
                 "user_id": user_id,
             },
         )
-    except stripe.error.StripeError:
+
+
+def _resolve_customer_for_payment_method(request, payment_method_id):
+    """
+    Resolve the caller's customer id and verify payment-method ownership.
+
+    Warm path: the SetupIntent view stashed the customer id in the
+    session moments earlier, saving the SELECT. Cold path: one
+    round-trip answers both questions — the customer id and, via a
+    correlated subquery, which customer the synced djstripe
+    payment-method row belongs to.
+
+    Ownership is only checked locally when the synced djstripe row can
+    answer. Methods the webhook hasn't delivered yet are left for
+    Subscription.create to validate — Stripe rejects a foreign payment
+    method there anyway, so the old pre-flight retrieve was a wasted
+    round-trip on exactly the freshest methods.
+
+    Returns (customer_id, None) on success or (None, error_response)
+    when the customer is missing or the method belongs to another
+    customer; error paths detach the payment method before responding.
+    """
+    session = getattr(request, "session", None)
+    customer_id = session.get(_CUSTOMER_ID_SESSION_KEY) if session else None
+    if customer_id is not None:
+        pm_customer_id = (
+            PaymentMethod.objects.filter(id=payment_method_id)
+            .values_list("customer_id", flat=True)
+            .first()
+        )
+    else:
+        row = (
+            Customer.objects.filter(subscriber=request.user)
+            .annotate(
+                pm_customer_id=Subquery(
+                    PaymentMethod.objects.filter(
+                        id=payment_method_id,
+                    ).values("customer_id")[:1],
+                ),
+            )
+            .values_list("id", "pm_customer_id")
+            .first()
+        )
+        if row is None:
+            logger.error(
+                "Customer not found for user",
+                extra={"user_id": request.user.id},
+            )
+            _cleanup_payment_method(payment_method_id, request.user.id)
+            return None, _json_response(
+                {"error": "Customer account not found"},
+                status=404,
+            )
+        customer_id, pm_customer_id = row
+
+    if pm_customer_id is not None and pm_customer_id != customer_id:
         logger.warning(
-            "Failed to detach payment method after subscription failure",
-            exc_info=True,
+            "Payment method customer mismatch",
             extra={
                 "payment_method_id": payment_method_id,
-                "user_id": user_id,
+                "pm_customer": pm_customer_id,
+                "expected_customer": customer_id,
+                "user_id": request.user.id,
             },
         )
+        _cleanup_payment_method(payment_method_id, request.user.id)
+        return None, _json_response({"error": "Invalid payment method"}, status=403)
+
+    return customer_id, None
 
 
 @require_POST
+@login_required_json
 def create_subscription_view(request):  # noqa: PLR0911, C901
     """Create subscription with custom pricing after payment method is confirmed."""
-    if not request.user.is_authenticated:
-        return JsonResponse({"error": "Authentication required"}, status=401)
-
     payment_method_id = None  # Track for cleanup on failure
 
     try:
-        data = json.loads(request.body)
+        data = orjson.loads(request.body)
         payment_method_id = data.get("payment_method_id")
 
         if not payment_method_id:
-            return JsonResponse({"error": "payment_method_id is required"}, status=400)
+            return _json_response(
+                {"error": "payment_method_id is required"},
+                status=400,
+            )
 
         # Extract pricing parameters with defaults ($1/year)
         amount_cents = data.get("amount_cents", 100)
@@ -210,42 +372,16 @@ def create_subscription_view(request):  # noqa: PLR0911, C901
             interval_count = int(interval_count)
         except (TypeError, ValueError):
             _cleanup_payment_method(payment_method_id, request.user.id)
-            return JsonResponse(
+            return _json_response(
                 {"error": "amount_cents and interval_count must be integers"},
                 status=400,
             )
 
+        # Fail fast: pure-Python range/membership checks cost microseconds,
+        # so bad requests are rejected before any DB or Stripe round-trip
+        # (get_or_create_price re-validates, but that call is never reached)
         try:
-            customer = Customer.objects.get(subscriber=request.user)
-        except Customer.DoesNotExist:
-            logger.exception(
-                "Customer not found for user",
-                extra={"user_id": request.user.id},
-            )
-            _cleanup_payment_method(payment_method_id, request.user.id)
-            return JsonResponse(
-                {"error": "Customer account not found"},
-                status=404,
-            )
-
-        # Verify payment method belongs to this customer
-        payment_method = stripe.PaymentMethod.retrieve(payment_method_id)
-        if payment_method.customer != customer.id:
-            logger.warning(
-                "Payment method customer mismatch",
-                extra={
-                    "payment_method_id": payment_method_id,
-                    "pm_customer": payment_method.customer,
-                    "expected_customer": customer.id,
-                    "user_id": request.user.id,
-                },
-            )
-            _cleanup_payment_method(payment_method_id, request.user.id)
-            return JsonResponse({"error": "Invalid payment method"}, status=403)
-
-        # Get or create price for the requested parameters
-        try:
-            price_id = get_or_create_price(
+            validate_pricing_parameters(
                 amount_cents=amount_cents,
                 interval=interval,
                 interval_count=interval_count,
@@ -262,7 +398,35 @@ def create_subscription_view(request):  # noqa: PLR0911, C901
                 },
             )
             _cleanup_payment_method(payment_method_id, request.user.id)
-            return JsonResponse({"error": str(e)}, status=400)
+            return _json_response({"error": str(e)}, status=400)
+
+        customer_id, error = _resolve_customer_for_payment_method(
+            request,
+            payment_method_id,
+        )
+        if error is not None:
+            return error
+
+        # Local dedup before any Stripe traffic: a browser retrying a
+        # timed-out POST finds the attempt row from the first request
+        # and replays its stored result with one indexed SELECT
+        attempt, attempt_created = SubscriptionAttempt.objects.get_or_create(
+            user=request.user,
+            payment_method_id=payment_method_id,
+        )
+        if not attempt_created and attempt.subscription_id:
+            return _json_response(
+                {"success": True, "subscription_id": attempt.subscription_id},
+            )
+
+        # Get or create price for the requested parameters (already
+        # validated above, so only infrastructure failures surface here)
+        try:
+            price_id = get_or_create_price(
+                amount_cents=amount_cents,
+                interval=interval,
+                interval_count=interval_count,
+            )
         except PricingError as e:
             logger.exception(
                 "Pricing service error",
@@ -274,41 +438,49 @@ def create_subscription_view(request):  # noqa: PLR0911, C901
                 },
             )
             _cleanup_payment_method(payment_method_id, request.user.id)
-            return JsonResponse(
+            return _json_response(
                 {"error": f"Failed to configure pricing: {e!s}"},
                 status=500,
             )
 
         # Create subscription with dynamic price
         subscription = stripe.Subscription.create(
-            customer=customer.id,
+            customer=customer_id,
             items=[{"price": price_id}],
             default_payment_method=payment_method_id,
-            metadata={
-                "user_id": request.user.id,
-                "user_email": request.user.email,
-                "payment_method_id": payment_method_id,
-                "amount_cents": str(amount_cents),
-                "interval": interval,
-                "interval_count": str(interval_count),
-            },
+            # Just the owner link: payment method, amount and cadence are
+            # all native Stripe fields on the subscription/price, so
+            # duplicating them in metadata only fattens the request body
+            metadata={"user_id": str(request.user.id)},
+            # Keyed to the attempt row: a browser retrying a timed-out
+            # POST finds the same row and replays Stripe's stored
+            # response instead of opening a second subscription, while a
+            # re-subscribe after cancellation (the webhook deleted the
+            # row) gets a fresh key — a customer+method key would collide
+            # with the canceled subscription inside Stripe's ~24h
+            # idempotency window
+            idempotency_key=f"sub:{attempt.pk}",
         )
 
-        logger.info(
-            "Subscription created successfully",
-            extra={
-                "subscription_id": subscription.id,
-                "customer_id": customer.id,
-                "payment_method_id": payment_method_id,
-                "user_id": request.user.id,
-                "price_id": price_id,
-                "amount_cents": amount_cents,
-                "interval": interval,
-                "interval_count": interval_count,
-            },
-        )
+        attempt.subscription_id = subscription.id
+        attempt.save(update_fields=["subscription_id"])
 
-        return JsonResponse(
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Subscription created successfully",
+                extra={
+                    "subscription_id": subscription.id,
+                    "customer_id": customer_id,
+                    "payment_method_id": payment_method_id,
+                    "user_id": request.user.id,
+                    "price_id": price_id,
+                    "amount_cents": amount_cents,
+                    "interval": interval,
+                    "interval_count": interval_count,
+                },
+            )
+
+        return _json_response(
             {
                 "success": True,
                 "subscription_id": subscription.id,
@@ -316,16 +488,29 @@ def create_subscription_view(request):  # noqa: PLR0911, C901
             },
         )
 
-    except json.JSONDecodeError:
-        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except orjson.JSONDecodeError:
+        return _json_response({"error": "Invalid JSON"}, status=400)
+    except stripe.error.InvalidRequestError:
+        # Stripe's own ownership/attachment validation on
+        # Subscription.create, for payment methods djstripe hadn't
+        # synced when the local check above ran
+        logger.warning(
+            "Stripe rejected subscription parameters",
+            exc_info=True,
+            extra={
+                "payment_method_id": payment_method_id,
+                "user_id": request.user.id,
+            },
+        )
+        _cleanup_payment_method(payment_method_id, request.user.id)
+        return _json_response({"error": "Invalid payment method"}, status=403)
     except stripe.error.StripeError as e:
         logger.exception(
             "Stripe error creating subscription",
             extra={"user_id": request.user.id},
         )
-        if payment_method_id:
-            _cleanup_payment_method(payment_method_id, request.user.id)
-        return JsonResponse(
+        _cleanup_payment_method(payment_method_id, request.user.id)
+        return _json_response(
             {"error": f"Failed to create subscription: {e!s}"},
             status=500,
         )
@@ -334,6 +519,5 @@ def create_subscription_view(request):  # noqa: PLR0911, C901
             "Unexpected error creating subscription",
             extra={"user_id": request.user.id},
         )
-        if payment_method_id:
-            _cleanup_payment_method(payment_method_id, request.user.id)
-        return JsonResponse({"error": "An unexpected error occurred"}, status=500)
+        _cleanup_payment_method(payment_method_id, request.user.id)
+        return _json_response({"error": "An unexpected error occurred"}, status=500)
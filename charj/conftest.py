@@ -2,6 +2,7 @@ import re
 
 import pytest
 import responses
+from django.core.cache import cache
 
 from charj.tests.fixtures import stripe_responses as stripe_fixtures
 from charj.users.models import User
@@ -13,23 +14,32 @@ def _media_storage(settings, tmpdir) -> None:
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def _clear_cache() -> None:
+    """Keep the Django cache isolated between tests."""
+    cache.clear()
+
+
 @pytest.fixture
 def user(db) -> User:
     return UserFactory()
 
 
-@pytest.fixture(autouse=True)
-def mock_stripe_api():
+@pytest.fixture(scope="session")
+def _stripe_api_routes():
     """
     Session-wide mock for Stripe API requests.
-    Uses response fixtures from charj.tests.fixtures.stripe_responses.
+
+    Activated once so the route table is registered a single time;
+    uses response fixtures from charj.tests.fixtures.stripe_responses.
     """
     with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
         # Mock customer creation endpoint
         rsps.add(
             responses.POST,
             "https://api.stripe.com/v1/customers",
-            json=stripe_fixtures.CUSTOMER_RESPONSE,
+            body=stripe_fixtures.CUSTOMER_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -37,7 +47,8 @@ def mock_stripe_api():
         rsps.add(
             responses.GET,
             "https://api.stripe.com/v1/customers/cus_test_123",
-            json=stripe_fixtures.CUSTOMER_RESPONSE,
+            body=stripe_fixtures.CUSTOMER_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -45,7 +56,8 @@ def mock_stripe_api():
         rsps.add(
             responses.POST,
             "https://api.stripe.com/v1/setup_intents",
-            json=stripe_fixtures.SETUP_INTENT_RESPONSE,
+            body=stripe_fixtures.SETUP_INTENT_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -53,7 +65,8 @@ def mock_stripe_api():
         rsps.add(
             responses.GET,
             "https://api.stripe.com/v1/payment_methods/pm_test_123",
-            json=stripe_fixtures.PAYMENT_METHOD_RESPONSE,
+            body=stripe_fixtures.PAYMENT_METHOD_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -61,7 +74,8 @@ def mock_stripe_api():
         rsps.add(
             responses.POST,
             re.compile(r"https://api\.stripe\.com/v1/payment_methods/.*/detach"),
-            json=stripe_fixtures.PAYMENT_METHOD_RESPONSE,
+            body=stripe_fixtures.PAYMENT_METHOD_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -69,7 +83,8 @@ def mock_stripe_api():
         rsps.add(
             responses.POST,
             "https://api.stripe.com/v1/subscriptions",
-            json=stripe_fixtures.SUBSCRIPTION_RESPONSE,
+            body=stripe_fixtures.SUBSCRIPTION_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -77,7 +92,8 @@ def mock_stripe_api():
         rsps.add(
             responses.POST,
             "https://api.stripe.com/v1/billing_portal/sessions",
-            json=stripe_fixtures.CUSTOMER_PORTAL_SESSION_RESPONSE,
+            body=stripe_fixtures.CUSTOMER_PORTAL_SESSION_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -86,7 +102,8 @@ def mock_stripe_api():
         rsps.add(
             responses.GET,
             re.compile(r"https://api\.stripe\.com/v1/prices.*"),
-            json=stripe_fixtures.PRICE_LIST_EMPTY_RESPONSE,
+            body=stripe_fixtures.PRICE_LIST_EMPTY_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -94,7 +111,8 @@ def mock_stripe_api():
         rsps.add(
             responses.POST,
             "https://api.stripe.com/v1/prices",
-            json=stripe_fixtures.PRICE_RESPONSE,
+            body=stripe_fixtures.PRICE_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
@@ -102,8 +120,21 @@ def mock_stripe_api():
         rsps.add(
             responses.GET,
             re.compile(r"https://api\.stripe\.com/v1/products/.*"),
-            json=stripe_fixtures.PRODUCT_RESPONSE,
+            body=stripe_fixtures.PRODUCT_RESPONSE_BYTES,
+            content_type="application/json",
             status=200,
         )
 
         yield rsps
+
+
+@pytest.fixture(autouse=True)
+def mock_stripe_api(_stripe_api_routes):
+    """
+    Per-test view of the session Stripe mock.
+
+    The routes stay registered for the whole run; only the recorded call
+    log is cleared so each test asserts against its own requests.
+    """
+    _stripe_api_routes.calls.reset()
+    return _stripe_api_routes
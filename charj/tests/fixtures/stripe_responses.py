@@ -1,5 +1,7 @@
 """Stripe API response fixtures for testing."""
 
+import orjson
+
 # Customer creation/retrieval response
 CUSTOMER_RESPONSE = {
     "id": "cus_test_123",
@@ -371,3 +373,17 @@ PRODUCT_RESPONSE = {
     "updated": 1766545465,
     "url": None,
 }
+
+# Pre-serialized bytes for responses' mock registry: the dicts above are
+# immutable test data, so encoding them once at import saves a
+# json.dumps per matched request across the whole suite
+CUSTOMER_RESPONSE_BYTES = orjson.dumps(CUSTOMER_RESPONSE)
+SETUP_INTENT_RESPONSE_BYTES = orjson.dumps(SETUP_INTENT_RESPONSE)
+PAYMENT_METHOD_RESPONSE_BYTES = orjson.dumps(PAYMENT_METHOD_RESPONSE)
+SUBSCRIPTION_RESPONSE_BYTES = orjson.dumps(SUBSCRIPTION_RESPONSE)
+CUSTOMER_PORTAL_SESSION_RESPONSE_BYTES = orjson.dumps(
+    CUSTOMER_PORTAL_SESSION_RESPONSE,
+)
+PRICE_LIST_EMPTY_RESPONSE_BYTES = orjson.dumps(PRICE_LIST_EMPTY_RESPONSE)
+PRICE_RESPONSE_BYTES = orjson.dumps(PRICE_RESPONSE)
+PRODUCT_RESPONSE_BYTES = orjson.dumps(PRODUCT_RESPONSE)
@@ -1,8 +1,6 @@
 import logging
 from typing import Any
 
-import stripe
-from django.conf import settings
 from django.contrib.auth.signals import user_logged_in
 from django.dispatch import receiver
 from django.http import HttpRequest
@@ -12,8 +10,6 @@ from .models import User
 
 logger = logging.getLogger(__name__)
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
-
 
 @receiver(signal=user_logged_in)
 def create_stripe_customer(
@@ -22,23 +18,19 @@ def create_stripe_customer(
     user: User,
     **kwargs: dict[str, Any],
 ) -> None:
-    customers = Customer.objects.filter(email=user.email)
-    for customer in customers:
-        if not customer.subscriber:
-            logger.warning(
-                "Orphaned Stripe customer attached to user",
-                extra={
-                    "customer_id": customer.id,
-                },
-            )
-            customer.subscriber = user
-            customer.save()
-    if not customers:
-        customer, created = Customer.get_or_create(subscriber=user)
-        if created:
-            logger.info(
-                "Stripe customer created with trial subscription",
-                extra={
-                    "customer_id": customer.id,
-                },
-            )
+    # Only adopt orphaned rows here — a cheap local query. Creating the
+    # Stripe customer at login would put a Stripe round-trip on every
+    # first login for nothing: the card views call Customer.get_or_create
+    # on demand, so the customer materializes the first time it's needed.
+    orphans = Customer.objects.filter(email=user.email, subscriber__isnull=True)
+    orphan_ids = list(orphans.values_list("id", flat=True))
+    if orphan_ids:
+        # One UPDATE for all orphans instead of a per-row save(), and no
+        # model instances built along the way
+        Customer.objects.filter(id__in=orphan_ids).update(subscriber=user)
+        logger.warning(
+            "Orphaned Stripe customers attached to user",
+            extra={
+                "customer_ids": orphan_ids,
+            },
+        )
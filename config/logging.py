@@ -1,108 +1,118 @@
 """Custom logging components for structured logging with request context."""
 
 import logging
-import uuid
+import os
 from contextvars import ContextVar
 from typing import Any
 
 from django.http import HttpRequest
 
-# Context variables for storing request-scoped data
-request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
-session_id_var: ContextVar[str | None] = ContextVar("session_id", default=None)
-user_id_var: ContextVar[int | None] = ContextVar("user_id", default=None)
-user_email_var: ContextVar[str | None] = ContextVar("user_email", default=None)
-request_path_var: ContextVar[str | None] = ContextVar("request_path", default=None)
-request_method_var: ContextVar[str | None] = ContextVar("request_method", default=None)
-ip_address_var: ContextVar[str | None] = ContextVar("ip_address", default=None)
+# The whole request context rides in one ContextVar as a plain dict:
+# bound once per request by RequestContextMiddleware, merged into each
+# LogRecord in one pass instead of seven ContextVar.get() calls per line
+request_context_var: ContextVar[dict[str, Any] | None] = ContextVar(
+    "request_context",
+    default=None,
+)
+
+# Fallback for records emitted outside a request, so formatters always
+# find the fields
+_EMPTY_CONTEXT: dict[str, Any] = {
+    "request_id": None,
+    "session_id": None,
+    "user_id": None,
+    "user_email": None,
+    "path": None,
+    "method": None,
+    "ip_address": None,
+}
+
+# Crawler endpoints that never need log correlation; skipping them also
+# avoids touching the session for requests that never carry one
+_SKIP_PATHS = frozenset({"/sitemap.xml", "/robots.txt"})
 
 
 class RequestContextFilter(logging.Filter):
     """
     Logging filter that adds request context from contextvars to LogRecord.
 
-    This filter reads values from contextvars set by RequestContextMiddleware
-    and adds them as extra fields to each log record. These fields are then
+    This filter reads the context dict bound by RequestContextMiddleware
+    and adds its fields to each log record. These fields are then
     automatically included in structured log output (JSON in production, Rich in dev).
     """
 
     def filter(self, record: logging.LogRecord) -> bool:
-        """Add context variables to the log record."""
-        # Only add fields if they don't already exist (don't override explicit values)
-        if not hasattr(record, "request_id"):
-            record.request_id = request_id_var.get()
-        if not hasattr(record, "session_id"):
-            record.session_id = session_id_var.get()
-        if not hasattr(record, "user_id"):
-            record.user_id = user_id_var.get()
-        if not hasattr(record, "user_email"):
-            record.user_email = user_email_var.get()
-        if not hasattr(record, "path"):
-            record.path = request_path_var.get()
-        if not hasattr(record, "method"):
-            record.method = request_method_var.get()
-        if not hasattr(record, "ip_address"):
-            record.ip_address = ip_address_var.get()
-
+        """Merge the bound request context into the log record."""
+        context = request_context_var.get() or _EMPTY_CONTEXT
+        record_dict = record.__dict__
+        for key, value in context.items():
+            # Don't override values passed explicitly via extra=
+            if key not in record_dict:
+                record_dict[key] = value
         return True
 
 
 class RequestContextMiddleware:
     """
-    Middleware that extracts request context and stores it in contextvars.
+    Middleware that extracts request context and stores it in a contextvar.
 
-    This middleware runs early in the request/response cycle and populates
-    contextvars with user information, request metadata, and a unique request ID.
-    These values are then picked up by RequestContextFilter and added to all logs.
+    This middleware runs early in the request/response cycle and binds a
+    dict with user information, request metadata, and a unique request ID.
+    The dict is then picked up by RequestContextFilter and added to all logs.
     """
 
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request: HttpRequest) -> Any:
-        # Generate unique request ID
-        req_id = str(uuid.uuid4())
-        request_id_var.set(req_id)
+        if request.path in _SKIP_PATHS:
+            return self.get_response(request)
+
+        # Generate unique request ID. 64 random bits is plenty for log
+        # correlation, and os.urandom(8).hex() skips uuid4's bit
+        # twiddling and dashed formatting on every request
+        req_id = os.urandom(8).hex()
 
         # Get session ID (persists across requests for the same user)
         # Only log first 8 chars for security - enough to trace sessions
-        # without exposing full key
+        # without exposing full key. Never force-create one here: that
+        # wrote a session row on every first-touch anonymous request
+        # (crawlers, health checks, robots.txt) just to label log lines.
+        # A key that materializes later (login) is picked up next request.
         session_key = request.session.session_key
-        if not session_key:
-            # Create session if it doesn't exist
-            request.session.create()
-            session_key = request.session.session_key
-        session_id_var.set(session_key[:8] if session_key else None)
-
-        # Extract request metadata
-        request_path_var.set(request.path)
-        request_method_var.set(request.method)
-
-        # Get IP address (handle proxy headers)
-        x_forwarded_for = request.headers.get("x-forwarded-for")
+
+        # Get IP address (handle proxy headers). META is a plain dict
+        # keyed by the CGI name, skipping HttpHeaders' per-lookup name
+        # normalization; partition stops at the first comma without
+        # building a list of the remaining hops
+        x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
         if x_forwarded_for:
-            ip = x_forwarded_for.split(",")[0].strip()
+            ip = x_forwarded_for.partition(",")[0].strip()
         else:
             ip = request.META.get("REMOTE_ADDR")
-        ip_address_var.set(ip)
 
         # Extract user information if authenticated
         if hasattr(request, "user") and request.user.is_authenticated:
-            user_id_var.set(request.user.id)
-            user_email_var.set(request.user.email)
+            user_id = request.user.id
+            user_email = request.user.email
         else:
-            user_id_var.set(None)
-            user_email_var.set(None)
-
-        response = self.get_response(request)
-
-        # Clean up context vars after response (important for thread reuse)
-        request_id_var.set(None)
-        session_id_var.set(None)
-        user_id_var.set(None)
-        user_email_var.set(None)
-        request_path_var.set(None)
-        request_method_var.set(None)
-        ip_address_var.set(None)
-
-        return response
+            user_id = None
+            user_email = None
+
+        # Bind once; reset() restores the prior binding in one operation
+        # and runs even when the view raises (important for thread reuse)
+        token = request_context_var.set(
+            {
+                "request_id": req_id,
+                "session_id": session_key[:8] if session_key else None,
+                "user_id": user_id,
+                "user_email": user_email,
+                "path": request.path,
+                "method": request.method,
+                "ip_address": ip,
+            },
+        )
+        try:
+            return self.get_response(request)
+        finally:
+            request_context_var.reset(token)
@@ -20,16 +20,19 @@ class CustomLoginRequiredMiddleware(LoginRequiredMiddleware):
     def __init__(self, get_response=None):
         self.get_response = get_response
         super().__init__(get_response)
+        # Split OPEN_URLS once at startup: exact matches become one set
+        # lookup, prefixes one str.startswith(tuple) call — both C-level,
+        # replacing the per-request Python loop over every pattern
+        self._exact = frozenset(
+            pattern for pattern in settings.OPEN_URLS if not pattern.endswith("*")
+        )
+        self._prefixes = tuple(
+            pattern[:-1] for pattern in settings.OPEN_URLS if pattern.endswith("*")
+        )
 
     def process_view(self, request, view_func, view_args, view_kwargs):
         """Process the view and check if the URL should be exempted from auth."""
-        for pattern in settings.OPEN_URLS:
-            if pattern.endswith("*"):
-                # Prefix match - remove the * and check startswith
-                prefix = pattern[:-1]
-                if request.path.startswith(prefix):
-                    return None  # Skip auth
-            # Exact match
-            elif request.path == pattern:
-                return None  # Skip auth
+        path = request.path
+        if path in self._exact or path.startswith(self._prefixes):
+            return None  # Skip auth
         return super().process_view(request, view_func, view_args, view_kwargs)
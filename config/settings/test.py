@@ -34,5 +34,11 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/dev/ref/settings/#media-url
 MEDIA_URL = "http://media.testserver/"
+# STRIPE
+# ------------------------------------------------------------------------------
+# Baseline the card tests are written against, set once here instead of
+# per-test settings mutations; tests only override what they deviate on.
+STRIPE_PRODUCT_ID = "prod_test_123"
+STRIPE_MIN_AMOUNT_CENTS = 50
 # Your stuff...
 # ------------------------------------------------------------------------------
@@ -1,27 +1,41 @@
 from datetime import UTC
 from datetime import datetime
+from functools import cache as memoize
 
 from django.contrib.sitemaps import Sitemap
 from django.urls import reverse
 
+# The static pages with their crawl priorities. Nothing here varies
+# between requests, so the tuple is built once at import instead of a
+# fresh list per crawler hit.
+_ITEMS = (
+    {"name": "home", "priority": 1.0},
+    {"name": "pricing", "priority": 0.8},
+    {"name": "about", "priority": 0.7},
+)
+
+# Fixed date for now - in production, track actual page updates
+_LASTMOD = datetime(2026, 1, 4, tzinfo=UTC)
+
+
+@memoize
+def _location(name: str) -> str:
+    """reverse() each view name once, not once per item per request."""
+    return reverse(name)
+
 
 class StaticViewSitemap(Sitemap):
     changefreq = "weekly"
     protocol = "https"
 
     def items(self):
-        return [
-            {"name": "home", "priority": 1.0},
-            {"name": "pricing", "priority": 0.8},
-            {"name": "about", "priority": 0.7},
-        ]
+        return _ITEMS
 
     def location(self, item):
-        return reverse(item["name"])
+        return _location(item["name"])
 
     def priority(self, item):
         return item["priority"]
 
     def lastmod(self, item):
-        # Return current date for now - in production, track actual page updates
-        return datetime(2026, 1, 4, tzinfo=UTC)
+        return _LASTMOD
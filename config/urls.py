@@ -6,6 +6,7 @@ from django.contrib.sitemaps.views import sitemap
 from django.urls import include
 from django.urls import path
 from django.views import defaults as default_views
+from django.views.decorators.cache import cache_page
 from django.views.generic import TemplateView
 
 from config.sitemaps import StaticViewSitemap
@@ -14,6 +15,10 @@ sitemaps = {
     "static": StaticViewSitemap,
 }
 
+# sitemap.xml and robots.txt are constant between deploys, so crawler
+# hits serve from the cache for a day instead of re-rendering
+_CRAWLER_PAGE_CACHE_SECONDS = 60 * 60 * 24
+
 urlpatterns = [
     path(
         "",
@@ -32,14 +37,19 @@ urlpatterns = [
     ),
     path(
         "sitemap.xml",
-        sitemap,
+        cache_page(_CRAWLER_PAGE_CACHE_SECONDS)(sitemap),
         {"sitemaps": sitemaps},
         name="django.contrib.sitemaps.views.sitemap",
     ),
     path(
         "robots.txt",
         login_not_required(
-            TemplateView.as_view(template_name="robots.txt", content_type="text/plain"),
+            cache_page(_CRAWLER_PAGE_CACHE_SECONDS)(
+                TemplateView.as_view(
+                    template_name="robots.txt",
+                    content_type="text/plain",
+                ),
+            ),
         ),
         name="robots",
     ),